@@ -4,8 +4,10 @@ from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import GenericViewSet
 from .models import CoachingInfo
 from .serializers import CoachingInfoSerializer
-from django.core.mail import EmailMessage
 from django.conf import settings
+from auth_app.models import AdminNotification
+from auth_app.notifications import notify_admin
+from mailer.utils import enqueue_email
 
 
 class CoachingViewSet(GenericViewSet):
@@ -23,7 +25,7 @@ class CoachingViewSet(GenericViewSet):
         # Save message
         coaching_message = serializer.save()
 
-        # Send emails
+        # Queue emails for the outbox worker
         self.send_notification_email(coaching_message)
         self.send_user_thank_you_email(coaching_message)
 
@@ -46,14 +48,9 @@ Message:
 Company Name: {message.compyany_name}
         """
         try:
-            EmailMessage(
-                subject=subject,
-                body=email_body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[settings.ADMIN_EMAIL],
-            ).send(fail_silently=False)
+            notify_admin(AdminNotification.KIND_COACHING, subject, email_body)
         except Exception as e:
-            print(f"Failed to send admin email: {e}")
+            print(f"Failed to queue admin email: {e}")
 
     def send_user_thank_you_email(self, message):
         subject = "You're One Step Closer – Thanks for Your Introduction!"
@@ -74,11 +71,6 @@ Author, Coach & Crown Ambassador
 https://mapyourfreedom.com
         """
         try:
-            EmailMessage(
-                subject=subject,
-                body=email_body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[message.email],
-            ).send(fail_silently=False)
+            enqueue_email(subject=subject, body=email_body, to=[message.email])
         except Exception as e:
-            print(f"Failed to send thank-you email: {e}")
+            print(f"Failed to queue thank-you email: {e}")
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import Book, User, NotificationSettings
+from .catalog import bump_user_books_version
+from .models import AdminNotification, Book, User, NotificationSettings
 
 # Register your models here. 
 @admin.register(User)
@@ -29,6 +30,13 @@ class UserAdmin(BaseUserAdmin):
     ordering = ('email',)
     filter_horizontal = ('books',)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # m2m_changed covers books added or removed here; bump anyway so any
+        # edit in the admin refreshes the user's cached entitlements. The
+        # changeform is atomic: the bump waits for its commit.
+        bump_user_books_version(form.instance.pk)
+
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
     list_display = ('name', 'price', 'language')
@@ -39,7 +47,9 @@ class NotificationSettingsAdmin(admin.ModelAdmin):
         'coaching_notification',
         'guide_notification',
         'contact_notification',
+        'delivery',
     )
+    readonly_fields = ('last_digest_at',)
 
     def coaching_notification(self, obj):
         return obj.notify_coaching
@@ -54,4 +64,10 @@ class NotificationSettingsAdmin(admin.ModelAdmin):
     def contact_notification(self, obj):
         return obj.notify_contact
     contact_notification.boolean = True
-    contact_notification.short_description = "Contact Notification"
\ No newline at end of file
+    contact_notification.short_description = "Contact Notification"
+
+@admin.register(AdminNotification)
+class AdminNotificationAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'kind', 'created_at', 'digested_at')
+    list_filter = ('kind', 'digested_at')
+    readonly_fields = ('kind', 'subject', 'body', 'created_at', 'digested_at')
@@ -5,3 +5,6 @@ class AuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_app'
     verbose_name = "Book Management"
+
+    def ready(self):
+        from . import signals  # noqa: F401
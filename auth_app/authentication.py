@@ -0,0 +1,9 @@
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+
+class BookClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    Validates the access token without loading the User row. request.user
+    is a TokenUser, whose ``token`` carries the ``books``, ``books_version``
+    and ``is_superuser`` claims added when JWT_BOOK_CLAIMS is on.
+    """
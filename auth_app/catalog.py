@@ -0,0 +1,118 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import bump_version_stamps, version_stamp
+
+from .models import Book, User
+
+CATALOG_VERSION_KEY = 'books:catalog-version'
+USER_BOOKS_VERSION_KEY = 'books:user-version:{}'
+ENTITLEMENTS_KEY = 'books:entitlements:{}:{}'
+CATALOG_SNAPSHOT_KEY = 'books:catalog-snapshot:{}'
+
+# (catalog version, rows) held by this process
+_snapshot = (None, None)
+
+
+def catalog_version():
+    """Changes whenever a Book row is saved or deleted."""
+    return version_stamp(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """
+    Change the catalog version once the current transaction commits (now,
+    outside one). A bump before the commit would let a concurrent request
+    cache the old rows, or send an ETag, under the new version.
+    """
+    transaction.on_commit(lambda: bump_version_stamps(CATALOG_VERSION_KEY))
+
+
+def user_books_version(user_id):
+    """Changes whenever the user's ``books`` are added, removed or cleared."""
+    return version_stamp(USER_BOOKS_VERSION_KEY.format(user_id))
+
+
+def bump_user_books_version(*user_ids):
+    """Change the users' book versions once the current transaction commits, as bump_catalog_version."""
+    keys = [USER_BOOKS_VERSION_KEY.format(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: bump_version_stamps(*keys))
+
+
+def build_catalog_snapshot():
+    """Serialize every book once, without any per-user fields."""
+    from .serializers import BookSerializer
+
+    rows = BookSerializer(Book.objects.order_by('pk'), many=True).data
+    return tuple({key: value for key, value in row.items() if key != 'has_book_access'} for row in rows)
+
+
+def catalog_snapshot():
+    """
+    The serialized catalog for the current catalog version: from this
+    process's memory, else the shared cache, else built and stored in both.
+    Callers must not mutate the rows.
+    """
+    global _snapshot
+    version = catalog_version()
+    if _snapshot[0] == version:
+        return _snapshot[1]
+
+    key = CATALOG_SNAPSHOT_KEY.format(version)
+    rows = cache.get(key)
+    if rows is None:
+        rows = build_catalog_snapshot()
+        cache.set(key, rows, getattr(settings, 'CATALOG_SNAPSHOT_SECONDS', 60 * 60 * 24))
+    _snapshot = (version, rows)
+    return rows
+
+
+def user_book_ids(user):
+    """
+    The ids of the books ``user`` may read, cached under the user's current
+    version stamp. Bumping the stamp (m2m_changed, the Stripe grant, admin
+    edits) makes every process miss and reload it on the next read.
+    """
+    version = user_books_version(user.pk)
+    # A JWT with book claims (JWT_BOOK_CLAIMS) answers it while its version
+    # is still the current one
+    token = getattr(user, 'token', None)
+    if token is not None and 'books' in token and token.get('books_version') == version:
+        return frozenset(token['books'])
+
+    key = ENTITLEMENTS_KEY.format(user.pk, version)
+    book_ids = cache.get(key)
+    if book_ids is None:
+        # Through the join table, so a stateless TokenUser works as well
+        book_ids = frozenset(
+            User.books.through.objects.filter(user_id=user.pk).values_list('book_id', flat=True)
+        )
+        cache.set(key, book_ids, getattr(settings, 'ENTITLEMENT_CACHE_SECONDS', 3600))
+    return book_ids
+
+
+def add_book_claims(token, user):
+    """Sign the user's book ids, their version, superuser flag and email into ``token``."""
+    # Version first: if it changes meanwhile, the claims are merely treated as stale
+    token['books_version'] = user_books_version(user.pk)
+    token['books'] = sorted(user_book_ids(user))
+    token['is_superuser'] = user.is_superuser
+    # Stamped into downloaded books
+    token['email'] = user.email
+    return token
+
+
+def catalog_etag(request):
+    """
+    ETag for a catalog response to ``request``: the catalog and user
+    versions plus everything else the body depends on (user, URL and
+    negotiated format).
+    """
+    user = request.user
+    user_part = f"{user.pk}:{user_books_version(user.pk)}" if user and user.is_authenticated else 'anonymous'
+    accepted = getattr(request, 'accepted_media_type', '')
+    key = f"{catalog_version()}|{user_part}|{request.get_full_path()}|{accepted}"
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
@@ -0,0 +1,210 @@
+import os
+import re
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+# Sent with every protected file, whichever server ends up writing the bytes.
+# Shared caches must not keep the file; the reader's own client may, but has
+# to revalidate it (ETag / Last-Modified) before every use.
+SECURITY_HEADERS = {
+    'Cache-Control': 'private, no-cache, must-revalidate',
+    'Pragma': 'no-cache',
+    'Expires': '0',
+    'X-Frame-Options': 'DENY',
+    'Content-Security-Policy': "default-src 'none'; frame-ancestors 'none'",
+}
+
+SERVER_NGINX = 'nginx'
+SERVER_SENDFILE = 'sendfile'
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+RANGE_SPEC = re.compile(r'^(\d*)-(\d*)$')
+# More ranges than this in one request are ignored and the whole file is sent
+MAX_RANGES = 20
+
+
+def file_server():
+    """PROTECTED_FILE_SERVER: 'nginx' (X-Accel-Redirect), 'sendfile' (X-Sendfile) or '' (Django)."""
+    return (getattr(settings, 'PROTECTED_FILE_SERVER', '') or '').lower()
+
+
+def internal_url(path):
+    """The nginx ``internal`` location that maps onto MEDIA_ROOT for ``path``."""
+    prefix = getattr(settings, 'PROTECTED_MEDIA_INTERNAL_URL', '/protected-media/')
+    relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    if relative.startswith('../'):
+        raise ValueError(f"{path} is outside MEDIA_ROOT")
+    return prefix.rstrip('/') + '/' + quote(relative)
+
+
+def parse_range_header(header, size):
+    """
+    Parse a ``Range: bytes=...`` header for a file of ``size`` bytes.
+
+    Returns None when the header should be ignored (other units, bad
+    syntax, too many ranges), an empty list when no range can be satisfied,
+    or the (first, last) byte positions sorted with overlaps merged.
+    """
+    units, _, specs = header.partition('=')
+    if units.strip().lower() != 'bytes' or not specs.strip():
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        match = RANGE_SPEC.match(spec.strip())
+        if not match or not any(match.groups()):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            if int(last) and size:
+                ranges.append((max(size - int(last), 0), size - 1))
+            continue
+        first = int(first)
+        if last and int(last) < first:
+            return None
+        if first < size:
+            ranges.append((first, min(int(last), size - 1) if last else size - 1))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def file_etag(stat):
+    """Same shape as nginx's ETag, so validators agree whichever server sends the file."""
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def if_range_matches(if_range, etag, mtime):
+    if if_range.startswith('"'):
+        return if_range == etag
+    if if_range.startswith('W/'):
+        # If-Range needs a strong validator
+        return False
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def requested_ranges(request, size, mtime, etag):
+    """
+    The ranges to send for ``request``, or None for the whole file. A
+    Range whose If-Range validator no longer matches gets the whole file.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and not if_range_matches(if_range.strip(), etag, mtime):
+        return None
+    return parse_range_header(header, size)
+
+
+def read_range(path, first, last, block_size=STREAM_BLOCK_SIZE):
+    """Yield bytes ``first``..``last`` of the file without reading the rest."""
+    with open(path, 'rb') as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(block_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def multipart_ranges(path, ranges, size, content_type, boundary):
+    """The multipart/byteranges parts and their total length."""
+    headers = [
+        (f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+         f"Content-Range: bytes {first}-{last}/{size}\r\n\r\n").encode()
+        for first, last in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode()
+    length = sum(len(header) + last - first + 1 + 2 for header, (first, last) in zip(headers, ranges)) + len(closing)
+
+    def parts():
+        for header, (first, last) in zip(headers, ranges):
+            yield header
+            yield from read_range(path, first, last)
+            yield b'\r\n'
+        yield closing
+
+    return parts(), length
+
+
+def file_response(request, path, content_type, stat, etag):
+    """
+    Stream ``path`` from Django: the whole file, one range (206), several
+    ranges as multipart/byteranges (206) or 416 when none can be served.
+    """
+    size = stat.st_size
+    ranges = requested_ranges(request, size, stat.st_mtime, etag)
+
+    if ranges is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = STREAM_BLOCK_SIZE
+    elif not ranges:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+    elif len(ranges) == 1:
+        first, last = ranges[0]
+        response = StreamingHttpResponse(read_range(path, first, last), status=206, content_type=content_type)
+        response['Content-Range'] = f"bytes {first}-{last}/{size}"
+        response['Content-Length'] = last - first + 1
+    else:
+        boundary = uuid.uuid4().hex
+        parts, length = multipart_ranges(path, ranges, size, content_type, boundary)
+        response = StreamingHttpResponse(
+            parts, status=206, content_type=f"multipart/byteranges; boundary={boundary}",
+        )
+        response['Content-Length'] = length
+
+    return response
+
+
+def serve_protected_file(request, path, content_type, filename, as_attachment=False):
+    """
+    Return a response for a file the caller has already authorized.
+
+    Behind nginx or a server with X-Sendfile the response only names the
+    file and the proxy sends it (Range requests included), so the worker is
+    free straight away. Otherwise the file, or the byte ranges asked for,
+    are streamed in fixed-size blocks, so memory use does not depend on the
+    file size. A client that still has the current bytes gets a 304.
+    """
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    server = file_server()
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        response = not_modified
+    elif server == SERVER_NGINX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = internal_url(path)
+    elif server == SERVER_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = file_response(request, path, content_type, stat, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    for header, value in SECURITY_HEADERS.items():
+        response[header] = value
+    return response
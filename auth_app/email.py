@@ -0,0 +1,33 @@
+from django.conf import settings as django_settings
+from django.template.context import make_context
+from django.template.loader import get_template
+from djoser import email
+
+from mailer.rendering import get_built_template
+from mailer.utils import enqueue_email
+
+
+class PasswordResetEmail(email.PasswordResetEmail):
+    """
+    Djoser's password reset email, rendered in the request but delivered by
+    the outbox worker instead of inline.
+    """
+
+    def render(self):
+        # Same as djoser's, but prefers the optimized build of the template
+        context = make_context(self.get_context_data(), request=self.request)
+        template = get_built_template(self.template_name) or get_template(self.template_name)
+        with context.bind_template(template.template):
+            for node in template.template.nodelist:
+                self._process_node(node, context)
+        self._attach_body()
+
+    def send(self, to, fail_silently=False, **kwargs):
+        self.render()
+        enqueue_email(
+            subject=self.subject,
+            body=self.body,
+            html_body=self.html or '',
+            to=to,
+            from_email=kwargs.get('from_email', django_settings.DEFAULT_FROM_EMAIL),
+        )
@@ -0,0 +1,28 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from auth_app.models import Book
+from auth_app.previews import book_digest
+from auth_app.search import index_book_text
+
+
+class Command(BaseCommand):
+    help = "Extract the page text of every book whose file isn't indexed yet, for full-text search"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-index books that are already up to date")
+
+    def handle(self, *args, **options):
+        indexed = 0
+        for book in Book.objects.exclude(path='').order_by('pk'):
+            if not os.path.exists(book.path.path):
+                self.stderr.write(f"Missing file for book #{book.pk}: {book.path.name}")
+                continue
+            digest = book_digest(book)
+            if digest == book.text_digest and not options['force']:
+                continue
+            index_book_text(book, digest)
+            indexed += 1
+            self.stdout.write(f"Indexed {book} ({book.pages.count()} pages)")
+        self.stdout.write(self.style.SUCCESS(f"{indexed} book(s) indexed"))
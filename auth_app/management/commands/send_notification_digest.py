@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from auth_app.notifications import send_digest
+
+
+class Command(BaseCommand):
+    help = "Merge pending admin notifications into one digest email when the period is due"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Send the digest now even if the hourly/daily period has not passed",
+        )
+
+    def handle(self, *args, **options):
+        count = send_digest(force=options['force'])
+        if count:
+            self.stdout.write(self.style.SUCCESS(f"Digest queued with {count} notification(s)"))
+        else:
+            self.stdout.write("No digest due")
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0004_remove_user_has_ev_access_remove_user_has_sv_access'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='delivery',
+            field=models.CharField(choices=[('immediate', 'Immediately'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='Send each notification on its own or merge them into one summary email per period', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='last_digest_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='AdminNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('coaching', 'Coaching'), ('subscriber', 'Subscriber'), ('contact', 'Contact')], max_length=20)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('digested_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Admin Notification',
+                'verbose_name_plural': 'Admin Notifications',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['digested_at', 'created_at'], name='auth_app_ad_digeste_b90db9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 06:44
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0005_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='path',
+            field=models.FileField(max_length=1000, storage=core.storage.get_media_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.get_media_storage, upload_to='profile_images/'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2 on 2026-10-18 06:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE auth_app_bookpage_fts USING fts5(
+        text, content='auth_app_bookpage', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER auth_app_bookpage_fts_insert AFTER INSERT ON auth_app_bookpage BEGIN
+        INSERT INTO auth_app_bookpage_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER auth_app_bookpage_fts_delete AFTER DELETE ON auth_app_bookpage BEGIN
+        INSERT INTO auth_app_bookpage_fts(auth_app_bookpage_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER auth_app_bookpage_fts_update AFTER UPDATE OF text ON auth_app_bookpage BEGIN
+        INSERT INTO auth_app_bookpage_fts(auth_app_bookpage_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO auth_app_bookpage_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+
+POSTGRESQL_INDEX = [
+    """
+    ALTER TABLE auth_app_bookpage ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED
+    """,
+    "CREATE INDEX auth_app_bookpage_search ON auth_app_bookpage USING GIN (search_vector)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRESQL_INDEX}.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        # The triggers go with the table
+        schema_editor.execute("DROP TABLE IF EXISTS auth_app_bookpage_fts")
+    elif schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE auth_app_bookpage DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0006_media_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='text_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.CreateModel(
+            name='BookPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='auth_app.book')),
+            ],
+            options={
+                'ordering': ['book', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('book', 'number'), name='unique_book_page')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,10 +1,14 @@
 import os
 import shutil
+from datetime import timedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser, PermissionsMixin, BaseUserManager
 
+from core.storage import get_media_storage
+
 # Create your models here.
 
 class UserManager(BaseUserManager):
@@ -61,7 +65,7 @@ class User(AbstractUser, PermissionsMixin):
     email = models.EmailField(('email address'), unique=True,)
     gender = models.CharField(max_length=1, choices=GENDERS, default=MALE_TYPE)
     phone = models.CharField(max_length=14, unique=True, null=True, blank=True)
-    profile_picture = models.ImageField(upload_to='profile_images/', null=True, blank=True)
+    profile_picture = models.ImageField(upload_to='profile_images/', storage=get_media_storage, null=True, blank=True)
     books = models.ManyToManyField('Book', blank=True, related_name='users_with_access')
     
     objects = UserManager()
@@ -79,18 +83,58 @@ class Book(models.Model):
     name = models.CharField(max_length=256)
     price = models.IntegerField()
     language = models.CharField(max_length=256)
-    path = models.FileField(max_length=1000)
+    path = models.FileField(max_length=1000, storage=get_media_storage)
+    # SHA-256 of the file whose text is in ``pages``; blank until indexed
+    text_digest = models.CharField(max_length=64, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.name}"
 
 
+class BookPage(models.Model):
+    """The text of one page of a book, kept in the full-text index by database triggers."""
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='pages')
+    number = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['book', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'number'], name='unique_book_page'),
+        ]
+
+    def __str__(self):
+        return f"{self.book} p. {self.number}"
+
+
 from django.db import models
 
 class NotificationSettings(models.Model):
+    DELIVERY_IMMEDIATE = 'immediate'
+    DELIVERY_HOURLY = 'hourly'
+    DELIVERY_DAILY = 'daily'
+    DELIVERIES = (
+        (DELIVERY_IMMEDIATE, 'Immediately'),
+        (DELIVERY_HOURLY, 'Hourly digest'),
+        (DELIVERY_DAILY, 'Daily digest'),
+    )
+    DIGEST_PERIODS = {
+        DELIVERY_HOURLY: timedelta(hours=1),
+        DELIVERY_DAILY: timedelta(days=1),
+    }
+    CACHE_KEY = 'notification_settings'
+
     notify_coaching = models.BooleanField(default=True, help_text="Notify admin for new Coaching submissions")
     notify_subscriber = models.BooleanField(default=True, help_text="Notify admin for new Subscribers")
     notify_contact = models.BooleanField(default=True, help_text="Notify admin for new Contact messages")
+    delivery = models.CharField(
+        max_length=10,
+        choices=DELIVERIES,
+        default=DELIVERY_IMMEDIATE,
+        help_text="Send each notification on its own or merge them into one summary email per period"
+    )
+    last_digest_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return "Notification Settings"
@@ -98,3 +142,55 @@ class NotificationSettings(models.Model):
     class Meta:
         verbose_name = "Notification Settings"
         verbose_name_plural = "Notification Settings"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(self.CACHE_KEY)
+
+    @classmethod
+    def load(cls):
+        """Return the settings row (or None), cached for NOTIFICATION_SETTINGS_CACHE_SECONDS."""
+        settings_row = cache.get(cls.CACHE_KEY)
+        if settings_row is None:
+            # Cache a sentinel too, so "no settings row" is not looked up every time
+            settings_row = cls.objects.first() or False
+            cache.set(cls.CACHE_KEY, settings_row, getattr(settings, 'NOTIFICATION_SETTINGS_CACHE_SECONDS', 60))
+        return settings_row or None
+
+    def is_enabled(self, kind):
+        return getattr(self, f'notify_{kind}', True)
+
+    def digest_due(self, now):
+        period = self.DIGEST_PERIODS.get(self.delivery)
+        if period is None:
+            return True
+        return self.last_digest_at is None or now - self.last_digest_at >= period
+
+
+class AdminNotification(models.Model):
+    """An admin notification held back for the next digest email."""
+    KIND_COACHING = 'coaching'
+    KIND_SUBSCRIBER = 'subscriber'
+    KIND_CONTACT = 'contact'
+    KINDS = (
+        (KIND_COACHING, 'Coaching'),
+        (KIND_SUBSCRIBER, 'Subscriber'),
+        (KIND_CONTACT, 'Contact'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    digested_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = "Admin Notification"
+        verbose_name_plural = "Admin Notifications"
+        indexes = [
+            models.Index(fields=['digested_at', 'created_at']),
+        ]
+
+    def __str__(self):
+        return self.subject
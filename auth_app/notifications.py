@@ -0,0 +1,76 @@
+import logging
+from itertools import groupby
+
+from django.conf import settings
+from django.utils import timezone
+
+from mailer.utils import enqueue_email
+from .models import AdminNotification, NotificationSettings
+
+logger = logging.getLogger(__name__)
+
+
+def admin_email():
+    return getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)
+
+
+def notify_admin(kind, subject, body):
+    """
+    Tell the admin about a new submission, honouring NotificationSettings:
+    skipped when ``notify_<kind>`` is off, queued right away in immediate
+    mode, otherwise held for the next digest.
+    """
+    notification_settings = NotificationSettings.load()
+    if notification_settings and not notification_settings.is_enabled(kind):
+        logger.info(f"Admin notification skipped: {subject} ({kind} notifications disabled)")
+        return None
+
+    if notification_settings is None or notification_settings.delivery == NotificationSettings.DELIVERY_IMMEDIATE:
+        return enqueue_email(subject=subject, body=body, to=[admin_email()])
+
+    return AdminNotification.objects.create(kind=kind, subject=subject, body=body)
+
+
+def send_digest(force=False):
+    """
+    Merge pending notifications into one summary email if the configured
+    period has passed (or ``force`` is set). Returns the number merged.
+    """
+    notification_settings = NotificationSettings.load()
+    now = timezone.now()
+    if not force and notification_settings and not notification_settings.digest_due(now):
+        return 0
+
+    pending = list(AdminNotification.objects.filter(digested_at__isnull=True).order_by('kind', 'created_at'))
+    if not pending:
+        return 0
+
+    kinds = dict(AdminNotification.KINDS)
+    sections = []
+    for kind, notifications in groupby(pending, key=lambda notification: notification.kind):
+        notifications = list(notifications)
+        lines = [f"{kinds.get(kind, kind)} ({len(notifications)})", '=' * 40]
+        for notification in notifications:
+            lines.append(f"[{notification.created_at:%Y-%m-%d %H:%M}] {notification.subject}")
+            lines.append(notification.body.strip())
+            lines.append('-' * 40)
+        sections.append('\n'.join(lines))
+
+    enqueue_email(
+        subject=f"Map Your Freedom digest: {len(pending)} new notification(s)",
+        body='\n\n'.join(sections),
+        to=[admin_email()],
+    )
+    AdminNotification.objects.filter(pk__in=[notification.pk for notification in pending]).update(digested_at=now)
+
+    if notification_settings:
+        notification_settings.last_digest_at = now
+        notification_settings.save(update_fields=['last_digest_at'])
+
+    logger.info(f"Admin digest queued with {len(pending)} notification(s)")
+    return len(pending)
+
+
+def send_due_digest():
+    """Email worker hook; True when a digest was queued."""
+    return bool(send_digest())
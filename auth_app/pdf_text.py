@@ -0,0 +1,25 @@
+"""
+Extract the text of every page of a PDF. Runs in the background worker
+processes, so it must not import Django or anything that needs the app
+registry.
+"""
+
+
+def extract_text(source):
+    """Return one string per page of ``source``, in page order."""
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        pages = []
+        for index in range(len(pdf)):
+            page = pdf[index]
+            text_page = page.get_textpage()
+            try:
+                pages.append(text_page.get_text_bounded().replace('\r\n', '\n'))
+            finally:
+                text_page.close()
+                page.close()
+        return pages
+    finally:
+        pdf.close()
@@ -0,0 +1,62 @@
+"""
+Rasterize the first pages of a PDF. Runs in the background worker processes,
+so it must not import Django or anything that needs the app registry.
+"""
+import json
+import os
+import tempfile
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def page_name(number, image_format):
+    return f"page-{number:03d}.{image_format}"
+
+
+def write_atomic(path, write):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.partial')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            write(temp_file)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def render_preview(source, directory, pages, width, image_format='webp', quality=80):
+    """
+    Render up to ``pages`` pages of ``source`` ``width`` pixels wide into
+    ``directory``, then write the manifest that marks the preview ready.
+    Returns the manifest.
+    """
+    import pypdfium2
+
+    os.makedirs(directory, exist_ok=True)
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        rendered = []
+        for index in range(min(pages, len(pdf))):
+            page = pdf[index]
+            try:
+                scale = width / page.get_width()
+                image = page.render(scale=scale).to_pil()
+            finally:
+                page.close()
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+
+            name = page_name(index + 1, image_format)
+            write_atomic(
+                os.path.join(directory, name),
+                lambda f: image.save(f, format=image_format.upper(), quality=quality, optimize=True),
+            )
+            rendered.append({'number': index + 1, 'name': name, 'width': image.width, 'height': image.height})
+        manifest = {'page_count': len(pdf), 'pages': rendered}
+    finally:
+        pdf.close()
+
+    write_atomic(os.path.join(directory, MANIFEST_NAME), lambda f: f.write(json.dumps(manifest).encode()))
+    return manifest
@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.storage import file_digest
+from core.workers import is_pending, submit_once
+
+from .preview_render import MANIFEST_NAME, render_preview
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_DIR = 'previews'
+DIGEST_NAME = re.compile(r'^[0-9a-f]{64}$')
+DIGEST_KEY = 'books:file-digest:{}'
+
+
+def preview_options():
+    return {
+        'pages': getattr(settings, 'BOOK_PREVIEW_PAGES', 5),
+        'width': getattr(settings, 'BOOK_PREVIEW_WIDTH', 800),
+        'image_format': getattr(settings, 'BOOK_PREVIEW_FORMAT', 'webp'),
+        'quality': getattr(settings, 'BOOK_PREVIEW_QUALITY', 80),
+    }
+
+
+def book_digest(book):
+    """
+    SHA-256 of the book's file: its stored name, or hashed for files stored
+    before content addressing. Those hashes are cached per (path, size,
+    mtime), so the PDF is only read again once it has been replaced.
+    """
+    stem = os.path.splitext(os.path.basename(book.path.name))[0]
+    if DIGEST_NAME.match(stem):
+        return stem
+
+    path = book.path.path
+    stat = os.stat(path)
+    version = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+    key = DIGEST_KEY.format(hashlib.sha1(version.encode()).hexdigest())
+    digest = cache.get(key)
+    if digest is None:
+        digest = file_digest(path)
+        cache.set(key, digest, None)
+    return digest
+
+
+def preview_name(digest, options):
+    """
+    MEDIA_ROOT-relative directory for one file's preview at one size. Named
+    by an HMAC of the digest: the content-addressed book itself is stored
+    under the raw digest, which public preview URLs must not reveal.
+    """
+    key = hmac.new(settings.SECRET_KEY.encode(), f"preview:{digest}".encode(), hashlib.sha256).hexdigest()
+    return f"{PREVIEW_DIR}/{key[:2]}/{key}/{options['width']}-{options['image_format']}"
+
+
+def read_manifest(directory, options):
+    """The manifest if the preview in ``directory`` is complete for ``options``, else None."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'rb') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if len(manifest['pages']) < min(options['pages'], manifest['page_count']):
+        return None
+    return manifest
+
+
+def has_file(book):
+    return bool(book.path) and os.path.exists(book.path.path)
+
+
+def schedule_preview(book):
+    """
+    Queue the preview of ``book`` for rendering unless it is ready or
+    already queued by this process. Returns False when the queue is full;
+    the next request for the preview tries again.
+    """
+    if not has_file(book):
+        return False
+    options = preview_options()
+    digest = book_digest(book)
+    directory = os.path.join(settings.MEDIA_ROOT, preview_name(digest, options))
+    if read_manifest(directory, options) is not None:
+        return True
+
+    key = ('preview', digest)
+    future = submit_once(key, render_preview, book.path.path, directory, **options)
+    if future is None:
+        return is_pending(key)
+    future.add_done_callback(lambda done: rendered(digest, done))
+    return True
+
+
+def rendered(digest, future):
+    if future.exception() is not None:
+        logger.error("Rendering the preview of %s failed", digest, exc_info=future.exception())
+
+
+def book_preview(book):
+    """
+    The ready preview of ``book`` as ``{'page_count', 'pages': [{'number',
+    'url', 'width', 'height'}]}``, or None after queueing it for rendering.
+    Only the small manifest is read; the images are static files.
+    """
+    options = preview_options()
+    name = preview_name(book_digest(book), options)
+    manifest = read_manifest(os.path.join(settings.MEDIA_ROOT, name), options)
+    if manifest is None:
+        schedule_preview(book)
+        return None
+    return {
+        'page_count': manifest['page_count'],
+        'pages': [
+            {
+                'number': page['number'],
+                'url': f"{settings.MEDIA_URL}{name}/{page['name']}",
+                'width': page['width'],
+                'height': page['height'],
+            }
+            for page in manifest['pages'][:options['pages']]
+        ],
+    }
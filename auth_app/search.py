@@ -0,0 +1,103 @@
+import logging
+
+from django.db import connection, transaction
+
+from core.search import MATCH_END, MATCH_START, fts5_expression, highlight, tsquery_expression
+from core.workers import submit_once
+
+from .models import Book, BookPage
+from .pdf_text import extract_text
+from .previews import book_digest, has_file
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_TOKENS = 16
+
+
+def index_book_text(book, digest=None):
+    """Extract and index the pages of ``book`` now, in this process."""
+    digest = digest or book_digest(book)
+    store_pages(book.pk, digest, extract_text(book.path.path))
+
+
+def store_pages(book_id, digest, texts):
+    with transaction.atomic():
+        BookPage.objects.filter(book_id=book_id).delete()
+        BookPage.objects.bulk_create(
+            [BookPage(book_id=book_id, number=number, text=text) for number, text in enumerate(texts, 1)],
+            batch_size=500,
+        )
+        # update() rather than save(): no post_save, so no new indexing round
+        Book.objects.filter(pk=book_id).update(text_digest=digest)
+
+
+def schedule_text_index(book):
+    """
+    Extract the text of ``book`` in the background process pool, unless the
+    current file is already indexed or queued (see core.workers.submit_once). The
+    pages are stored from the pool's result thread.
+    """
+    if not has_file(book):
+        return
+    digest = book_digest(book)
+    if digest == book.text_digest:
+        return
+
+    def indexed(future):
+        try:
+            store_pages(book.pk, digest, future.result())
+        except Exception:
+            logger.exception("Indexing the text of book %s failed", book.pk)
+        finally:
+            # This thread isn't a request; don't leave its connection open
+            connection.close()
+
+    future = submit_once(('text', book.pk, digest), extract_text, book.path.path)
+    if future is not None:
+        future.add_done_callback(indexed)
+
+
+def search_pages(query, book_ids, limit=50):
+    """
+    Pages of the books in ``book_ids`` that match ``query``, best first, as
+    ``{'book', 'page', 'snippet'}`` dicts with matches wrapped in <mark>.
+    Served from the full-text index alone; no PDF is opened.
+    """
+    book_ids = sorted(book_ids)
+    if not book_ids or not query.strip():
+        return []
+    placeholders = ', '.join(['%s'] * len(book_ids))
+
+    if connection.vendor == 'postgresql':
+        expression = tsquery_expression(query)
+        if not expression:
+            return []
+        sql = f"""
+            SELECT book_id, number,
+                   ts_headline('simple', text, query, %s)
+            FROM auth_app_bookpage, to_tsquery('simple', %s) query
+            WHERE search_vector @@ query AND book_id IN ({placeholders})
+            ORDER BY ts_rank(search_vector, query) DESC, book_id, number
+            LIMIT %s
+        """
+        options = f'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords={SNIPPET_TOKENS}, MinWords=5'
+        params = [options, expression, *book_ids, limit]
+    else:
+        expression = fts5_expression(query)
+        if not expression:
+            return []
+        sql = f"""
+            SELECT page.book_id, page.number,
+                   snippet(auth_app_bookpage_fts, 0, %s, %s, '…', %s)
+            FROM auth_app_bookpage_fts
+            JOIN auth_app_bookpage page ON page.id = auth_app_bookpage_fts.rowid
+            WHERE auth_app_bookpage_fts MATCH %s AND page.book_id IN ({placeholders})
+            ORDER BY auth_app_bookpage_fts.rank, page.book_id, page.number
+            LIMIT %s
+        """
+        params = [MATCH_START, MATCH_END, SNIPPET_TOKENS, expression, *book_ids, limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [{'book': book_id, 'page': number, 'snippet': highlight(snippet)} for book_id, number, snippet in rows]
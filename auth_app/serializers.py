@@ -6,9 +6,14 @@ from djoser.serializers import (
     UserSerializer as BaseUserSerializer,
     PasswordRetypeSerializer
 )
+from django.conf import settings as django_settings
 from djoser import utils
 from djoser.conf import settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
+from auth_app.catalog import add_book_claims, user_book_ids
 from auth_app.models import Book
 
 User = get_user_model()
@@ -41,7 +46,12 @@ class BookSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(BaseUserSerializer):
-    books = BookSerializer(many=True, read_only=True)
+    books = serializers.SerializerMethodField()
+
+    def get_books(self, user):
+        book_ids = user_book_ids(user)
+        books = Book.objects.filter(id__in=book_ids) if book_ids else []
+        return BookSerializer(books, many=True, context=dict(self.context, user_books=book_ids)).data
 
     class Meta:
         model = User
@@ -79,4 +89,31 @@ class CustomPasswordResetConfirmRetypeSerializer(PasswordRetypeSerializer, seria
             key_error = "invalid_token"
             raise ValidationError(
                 {"token": [self.error_messages[key_error]]}, code=key_error
-            )
\ No newline at end of file
+            )
+
+
+class BookClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the user's book claims to issued tokens when JWT_BOOK_CLAIMS is on."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if getattr(django_settings, 'JWT_BOOK_CLAIMS', False):
+            add_book_claims(token, user)
+        return token
+
+
+class BookClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads the book claims for every refreshed access token, so a client
+    picks up a purchase by refreshing instead of logging in again.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if getattr(django_settings, 'JWT_BOOK_CLAIMS', False):
+            access = AccessToken(data['access'])
+            user = User.objects.get(**{jwt_settings.USER_ID_FIELD: access[jwt_settings.USER_ID_CLAIM]})
+            data['access'] = str(add_book_claims(access, user))
+        return data
+
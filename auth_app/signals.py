@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version, bump_user_books_version, catalog_snapshot
+from .models import Book, User
+from .previews import schedule_preview
+from .search import schedule_text_index
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed(sender, **kwargs):
+    def refresh():
+        # Both after commit: a snapshot built for the new version while the
+        # change is uncommitted would hold the old rows for a day
+        bump_catalog_version()
+        catalog_snapshot()
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, **kwargs):
+    # Render the preview of a new or replaced file ahead of the first visitor
+    if getattr(settings, 'BOOK_PREVIEW_ON_SAVE', True):
+        transaction.on_commit(lambda: schedule_preview(instance))
+    # Re-extract the text for search when the file changed
+    transaction.on_commit(lambda: schedule_text_index(instance))
+
+
+@receiver(pre_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    # The through rows go with the book without an m2m_changed signal. Read
+    # the users now, while the rows exist; their versions change on commit.
+    bump_user_books_version(*list(instance.users_with_access.values_list('pk', flat=True)))
+
+
+@receiver(m2m_changed, sender=User.books.through)
+def user_books_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # The bumps below take effect on commit (see auth_app.catalog)
+    if reverse and action == 'pre_clear':
+        # post_clear doesn't say which users the book had; read them first
+        instance._cleared_user_ids = list(instance.users_with_access.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_user_books_version(instance.pk)
+    elif action == 'post_clear':
+        bump_user_books_version(*getattr(instance, '_cleared_user_ids', ()))
+        instance._cleared_user_ids = []
+    else:
+        bump_user_books_version(*pk_set)
@@ -1,19 +1,25 @@
 import os
 from django.contrib.auth import get_user_model
-from django.http import StreamingHttpResponse, HttpResponse
 from django.conf import settings
+from django.utils.cache import get_conditional_response
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import viewsets
 from djoser.views import UserViewSet
 from djoser.compat import get_user_email
 from djoser.conf import settings as djoser_settings
 
+from .authentication import BookClaimsAuthentication
+from .catalog import catalog_etag, catalog_snapshot, user_book_ids
+from .delivery import serve_protected_file
 from .models import Book
+from .previews import book_preview
+from .search import search_pages
 from .serializers import BookSerializer, CustomPasswordResetConfirmRetypeSerializer
+from .watermark import watermark_enabled, watermarked_copy
 
 # Create your views here.
 
@@ -41,14 +47,93 @@ class BookViewSet(viewsets.ModelViewSet):
     serializer_class = BookSerializer
     queryset = Book.objects.all()  # Always show all books
 
+    def get_authenticators(self):
+        # With book claims in the token, reads here need no User row
+        if getattr(settings, 'JWT_BOOK_CLAIMS', False):
+            return [BookClaimsAuthentication()]
+        return super().get_authenticators()
+
     def get_serializer_context(self):
         user = self.request.user
         if user and user.is_authenticated:
             return {
-                'user_books': set(user.books.values_list('id', flat=True)),
+                'user_books': user_book_ids(user),
             }
         return {}
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.list_from_snapshot, *args, **kwargs)
+
+    def list_from_snapshot(self, request, *args, **kwargs):
+        """
+        Page through the cached catalog snapshot and mark the caller's own
+        books; no query or serializer runs while the snapshot is current.
+        """
+        rows = catalog_snapshot()
+        user_books = self.get_serializer_context().get('user_books', set())
+        page = self.paginate_queryset(rows)
+        data = [
+            dict(row, has_book_access=row['id'] in user_books)
+            for row in (rows if page is None else page)
+        ]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+    def conditional_response(self, request, render, *args, **kwargs):
+        """
+        Answer 304 when the client's ETag matches the current catalog and
+        user book versions, without querying or serializing the books.
+        """
+        etag = catalog_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @action(['GET'], detail=False)
+    def search(self, request):
+        """
+        Full-text search over the pages of the caller's own books:
+        ``?q=<words>[&book=<id>]``. Returns page numbers and snippets with
+        the matches in <mark>.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'Missing q'}, status=status.HTTP_400_BAD_REQUEST)
+
+        book_ids = user_book_ids(request.user)
+        book = request.query_params.get('book')
+        if book:
+            book_ids = {book_id for book_id in book_ids if str(book_id) == book}
+        return Response({'results': search_pages(query, book_ids)})
+
+    @action(['GET'], detail=True, permission_classes=[AllowAny])
+    def preview(self, request, pk=None):
+        """
+        Image URLs for the first pages of a book, open to anyone. Answers
+        202 while the pages are being rendered; the images themselves are
+        served from MEDIA_URL like any other static file.
+        """
+        book = self.get_object()
+        if not book.path:
+            return Response({'detail': 'No file'}, status=status.HTTP_404_NOT_FOUND)
+        if not os.path.exists(book.path.path):
+            return Response({'detail': 'File missing on server'}, status=status.HTTP_404_NOT_FOUND)
+
+        preview = book_preview(book)
+        if preview is None:
+            response = Response({'detail': 'Preview is being rendered'}, status=status.HTTP_202_ACCEPTED)
+            response['Retry-After'] = 5
+            return response
+        return Response(preview)
+
     @action(['GET'], detail=True)
     def get_book(self, request, pk=None):
         print(f"get_book called for user: {request.user} (id={request.user.id}) and book id: {pk}")
@@ -60,7 +145,7 @@ class BookViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Not Found'}, status=status.HTTP_404_NOT_FOUND)
 
         # Only allow if user has access
-        user_books = list(request.user.books.values_list('id', flat=True))
+        user_books = user_book_ids(request.user)
         print(f"User's accessible books: {user_books}")
         if not request.user.is_superuser and book.id not in user_books:
             print("Access forbidden: user does not have this book.")
@@ -77,16 +162,11 @@ class BookViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'File missing on server'}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            file = book.path.open('rb')
-            response = HttpResponse(content=file, status=status.HTTP_200_OK, content_type='application/pdf')
-            response['Content-Disposition'] = f"inline; filename={book.name}"
-            response['Content-Length'] = os.path.getsize(file_path)
-            response['Cache-Control'] = 'no-store, no-cache, must-revalidate, private'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-            response['X-Frame-Options'] = 'DENY'
-            response['Content-Security-Policy'] = "default-src 'none'; frame-ancestors 'none'"
-            print("PDF served successfully.")
+            if watermark_enabled():
+                file_path = watermarked_copy(file_path, book, request.user)
+                print(f"Serving watermarked copy: {file_path}")
+            response = serve_protected_file(request, file_path, 'application/pdf', book.name)
+            print("PDF handed off for delivery.")
             return response
         except Exception as error:
             print(f"Error serving PDF: {error}")
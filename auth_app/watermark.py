@@ -0,0 +1,181 @@
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+from .delivery import file_etag
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_DIR = '.watermarked'
+WATERMARK_FONT = NameObject('/MYFWatermark')
+WATERMARK_FONT_SIZE = 7
+# Distance of the stamp from the bottom-left corner of the page, in points
+WATERMARK_MARGIN = 18
+
+
+def watermark_enabled():
+    return getattr(settings, 'BOOK_WATERMARK', False)
+
+
+def watermark_cache_dir():
+    # Under MEDIA_ROOT so nginx / X-Sendfile can send the stamped copies too
+    return getattr(settings, 'WATERMARK_CACHE_DIR', None) or os.path.join(settings.MEDIA_ROOT, WATERMARK_DIR)
+
+
+def watermark_text(user):
+    email = getattr(user, 'email', None)
+    if email is None and hasattr(user, 'token'):
+        # A stateless token user; the email is signed into the token
+        email = user.token.get('email')
+    if email is None:
+        email = User.objects.values_list('email', flat=True).get(pk=user.pk)
+    return f"Licensed to {email}. Do not distribute."
+
+
+def pdf_literal(text):
+    """``text`` as a PDF literal string (Latin-1; other characters become '?')."""
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return b'(' + escaped.encode('latin-1', 'replace') + b')'
+
+
+def watermark_pdf(source, text, output):
+    """
+    Write ``source`` to ``output`` with ``text`` stamped at the foot of
+    every page, as an incremental update: the original file is copied
+    byte for byte and only the page dictionaries, one font and the stamp
+    streams are appended, so the cost is a copy plus a few KB per page
+    rather than a rewrite of every object.
+    """
+    writer = PdfWriter(source, incremental=True)
+
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+        NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+    }))
+    # Isolate the page's own graphics state so the stamp starts from defaults
+    save_state = DecodedStreamObject()
+    save_state.set_data(b'q\n')
+    save_state = writer._add_object(save_state)
+    literal = pdf_literal(text)
+
+    for page in writer.pages:
+        box = page.mediabox
+        stamp = DecodedStreamObject()
+        stamp.set_data(
+            b'Q\nq\nBT\n0.5 g\n/MYFWatermark %d Tf\n1 0 0 1 %.2f %.2f Tm\n%s Tj\nET\nQ\n' % (
+                WATERMARK_FONT_SIZE,
+                float(box.left) + WATERMARK_MARGIN,
+                float(box.bottom) + WATERMARK_MARGIN,
+                literal,
+            )
+        )
+
+        contents = page.get(NameObject('/Contents'))
+        if contents is None:
+            streams = []
+        elif isinstance(contents.get_object(), ArrayObject):
+            streams = list(contents.get_object())
+        else:
+            streams = [contents]
+        page[NameObject('/Contents')] = ArrayObject([save_state, *streams, writer._add_object(stamp)])
+
+        # Copy the resources onto the page so a shared (or inherited)
+        # dictionary is left as it was
+        resources = DictionaryObject(page.get(NameObject('/Resources'), DictionaryObject()).get_object())
+        fonts = DictionaryObject(resources.get(NameObject('/Font'), DictionaryObject()).get_object())
+        fonts[WATERMARK_FONT] = font
+        resources[NameObject('/Font')] = fonts
+        page[NameObject('/Resources')] = resources
+
+    writer.write(output)
+
+
+def cache_name(source, user_id, book_id):
+    """
+    Key for one user's copy of one version of a book file. Keyed with the
+    SECRET_KEY so names can't be guessed from ids if the directory is ever
+    exposed.
+    """
+    version = file_etag(os.stat(source))
+    key = f"{user_id}:{book_id}:{version}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), key, hashlib.sha256).hexdigest() + '.pdf'
+
+
+def watermarked_copy(source, book, user):
+    """
+    Path of ``source`` stamped for ``user``: the cached copy when there is
+    one, else stamped now and cached. A new file version gets a new key, so
+    stale copies are never served and age out through eviction.
+    """
+    directory = watermark_cache_dir()
+    path = os.path.join(directory, cache_name(source, user.pk, book.pk))
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        # Mark as recently used for eviction. The mtime is kept: it is part
+        # of the ETag / Last-Modified the reader revalidates with.
+        os.utime(path, (time.time(), stat.st_mtime))
+        return path
+
+    text = watermark_text(user)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.partial')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            watermark_pdf(source, text, temp_file)
+        if settings.FILE_UPLOAD_PERMISSIONS is not None:
+            os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    evict(directory, keep=path)
+    return path
+
+
+def evict(directory, keep=None):
+    """
+    Delete the least recently used copies until the directory fits in
+    WATERMARK_CACHE_MAX_BYTES. Returns the number of bytes removed.
+    """
+    limit = getattr(settings, 'WATERMARK_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+    entries = []
+    total = 0
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not entry.name.endswith('.pdf'):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        total += stat.st_size
+        entries.append((stat.st_atime, stat.st_size, entry.path))
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total - removed <= limit:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += size
+    if removed:
+        logger.info("Evicted %d bytes of watermarked books", removed)
+    return removed
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'contact',
     'subscriber',
     'Coaching',
+    'mailer',
 ]
 SITE_ID = 1
 
@@ -75,7 +76,7 @@ ROOT_URLCONF = 'backend.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -130,6 +131,77 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Protected files (book PDFs): 'nginx' hands the transfer to nginx with
+# X-Accel-Redirect, 'sendfile' to Apache/lighttpd with X-Sendfile, empty
+# streams it from Django. The nginx location must be internal and point at
+# MEDIA_ROOT:
+#   location /protected-media/ { internal; alias /path/to/media/; }
+PROTECTED_FILE_SERVER = os.getenv('PROTECTED_FILE_SERVER', '')
+PROTECTED_MEDIA_INTERNAL_URL = '/protected-media/'
+
+# Stamp each reader's email into the book PDFs they download. Stamped copies
+# are kept per user and file version under MEDIA_ROOT/.watermarked (so the
+# offload above still applies), least recently used first out past the limit
+BOOK_WATERMARK = os.getenv('BOOK_WATERMARK', 'True') == 'True'
+WATERMARK_CACHE_MAX_BYTES = int(os.getenv('WATERMARK_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# Processes per web worker for background rendering (book previews and
+# text, blog image sizes)
+BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', 2))
+# Most of those jobs pending per web worker; past it, new ones are skipped
+# and retried on the next save or request
+BACKGROUND_QUEUE_LIMIT = 20
+
+# Public previews of the first pages of each book, rendered in the
+# background into MEDIA_ROOT/previews when a book is saved or first
+# previewed, keyed by the file's hash
+BOOK_PREVIEW_PAGES = 5
+BOOK_PREVIEW_WIDTH = 800
+BOOK_PREVIEW_FORMAT = 'webp'
+BOOK_PREVIEW_QUALITY = 80
+BOOK_PREVIEW_ON_SAVE = True
+
+# Widths of the WebP/JPEG copies made of each blog image. They're stored
+# under content-hashed names in MEDIA_ROOT/blog_images/sizes, so they can be
+# served with a long-lived immutable Cache-Control
+BLOG_IMAGE_SIZES = {'thumbnail': 320, 'card': 640, 'hero': 1600}
+
+# Rendered blog list/detail responses, per audience (public or staff); a
+# BlogPost save or delete drops them, the timeout only bounds their size
+BLOG_RESPONSE_CACHE_SECONDS = 60 * 60
+# Longest one request may hold the rebuild of an entry; the others wait
+# for it while it's held
+BLOG_RESPONSE_CACHE_LOCK_SECONDS = 10
+
+# Static copy of the published blog API (export_blog_json) for a proxy or
+# CDN to serve at BLOG_STATIC_EXPORT_URL; with ON_SAVE every post change
+# rewrites the files it affects
+BLOG_STATIC_EXPORT_DIR = os.getenv('BLOG_STATIC_EXPORT_DIR', os.path.join(BASE_DIR, 'build', 'blog'))
+BLOG_STATIC_EXPORT_URL = '/blog-static/'
+BLOG_STATIC_EXPORT_ON_SAVE = os.getenv('BLOG_STATIC_EXPORT_ON_SAVE', 'False') == 'True'
+
+# RSS/Atom feeds and sitemaps (build_blog_feeds), stored gzipped and
+# re-rendered when a post is published, unpublished or updated
+BLOG_SITE_URL = os.getenv('BLOG_SITE_URL', 'https://mapyourfreedom.com/blog')
+BLOG_FEED_LENGTH = 50
+BLOG_FEED_MAX_AGE = 15 * 60
+
+# Shared by every worker process on the host, so version stamps and cached
+# settings agree between them; point CACHE_BACKEND/CACHE_LOCATION at Redis
+# or Memcached when running on more than one host
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, '.cache')),
+    }
+}
+
+# Per-user book id sets, keyed by the user's book version stamp
+ENTITLEMENT_CACHE_SECONDS = 3600
+
+# Serialized book catalog, rebuilt when a Book is saved or deleted
+CATALOG_SNAPSHOT_SECONDS = 60 * 60 * 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -152,6 +224,9 @@ DJOSER = {
         "user_delete": "djoser.serializers.UserDeleteSerializer",
         "password_reset_confirm_retype":"auth_app.serializers.CustomPasswordResetConfirmRetypeSerializer",
     },
+    'EMAIL': {
+        'password_reset': 'auth_app.email.PasswordResetEmail',
+    },
 }
 
 CORS_ALLOW_ALL_ORIGINS = False
@@ -170,6 +245,52 @@ SENDGRID_SANDBOX_MODE_IN_DEBUG = False
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', DEFAULT_FROM_EMAIL)
 
+# Outbox: request handlers queue mail, `manage.py run_email_worker` sends it
+EMAIL_OUTBOX_BATCH_SIZE = 20
+EMAIL_OUTBOX_POLL_SECONDS = 2
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = 3600
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+# Attachments, inline images and compiled email templates are cached in
+# memory; the files' mtimes are rechecked this often
+EMAIL_ASSET_CHECK_SECONDS = 60
+EMAIL_WORKER_JOBS = [
+    'subscriber.emails.run_pending_guide_resends',
+    'auth_app.notifications.send_due_digest',
+]
+# How long NotificationSettings is cached per process
+NOTIFICATION_SETTINGS_CACHE_SECONDS = 60
+GUIDE_RESEND_CHUNK_SIZE = 100
+# A resend whose chunks error this many times in a row is marked failed
+GUIDE_RESEND_MAX_ATTEMPTS = 3
+
+# Mini-guide in welcome emails: 'attachment' attaches the PDF, 'link' sends a
+# signed download link that expires after MINI_GUIDE_LINK_MAX_AGE seconds
+MINI_GUIDE_DELIVERY = os.getenv('MINI_GUIDE_DELIVERY', 'attachment')
+MINI_GUIDE_LINK_MAX_AGE = 60 * 60 * 24 * 30
+# Public address of this backend, used for links in emails
+BACKEND_URL = os.getenv('BACKEND_URL', 'https://backend.mapyourfreedom.com')
+
+# Newsletter broadcasts (`manage.py send_broadcast <id>`)
+BROADCAST_TRANSPORT = 'subscriber.broadcast.SendGridTransport'
+BROADCAST_BATCH_SIZE = 1000
+BROADCAST_SENDS_PER_SECOND = None
+
+# Optimized email templates (`manage.py build_email_templates`); senders fall
+# back to the source template when a build is missing or older than it
+EMAIL_TEMPLATE_BUILD_DIR = os.path.join(BASE_DIR, 'build', 'email_templates')
+EMAIL_OPTIMIZED_TEMPLATES = [
+    'subscriber/welcome_email.html',
+    'contact/contact_thank_you_email.html',
+    'contact/contact_admin_reply_email.html',
+    'email/password_reset.html',
+]
+# <img> sources (relative to MEDIA_ROOT) rewritten to the given content id
+EMAIL_INLINE_IMAGES = {
+    'images/Map-Your_Freedom.jpeg': 'banner',
+}
+
 # Security for production
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
@@ -202,4 +323,9 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
-}
\ No newline at end of file
+    'TOKEN_OBTAIN_SERIALIZER': 'auth_app.serializers.BookClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'auth_app.serializers.BookClaimsTokenRefreshSerializer',
+}
+# Sign owned book ids into access tokens and let BookViewSet authorize from
+# the token alone; clients refresh their token after a purchase
+JWT_BOOK_CLAIMS = os.getenv('JWT_BOOK_CLAIMS', 'False') == 'True'
\ No newline at end of file
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.http import HttpResponse
+
+from core.cache import bump_version_stamps, version_stamp
+
+LIST_VERSION_KEY = 'blog:list-version'
+POST_VERSION_KEY = 'blog:post-version:{}'
+RESPONSE_KEY = 'blog:response:{}'
+LOCK_KEY = 'blog:response-lock:{}'
+STATS_KEY = 'blog:cache-stats:{}'
+
+# Headers kept with a cached response besides its body and content type
+CACHED_HEADERS = ('Vary', 'Allow')
+LOCK_POLL_SECONDS = 0.025
+
+
+def bump_list_version():
+    """Every cached list response (any page, filter or search) is stale."""
+    bump_version_stamps(LIST_VERSION_KEY)
+
+
+def bump_post_versions(*slugs):
+    bump_version_stamps(*(POST_VERSION_KEY.format(slug) for slug in slugs))
+
+
+def audience(request):
+    # Staff see drafts; everyone else gets the same published-only responses
+    user = request.user
+    return 'staff' if user and user.is_authenticated and user.is_staff else 'public'
+
+
+def response_cache_key(request, slug=None):
+    """
+    Key for a response to ``request``: its absolute URL (bodies hold links
+    built on its scheme and host), the audience and negotiated format, and
+    the version stamp of the post (detail) or of the list. A bumped stamp
+    orphans the old entries instead of deleting them.
+    """
+    stamp = version_stamp(POST_VERSION_KEY.format(slug) if slug else LIST_VERSION_KEY)
+    accepted = getattr(request, 'accepted_media_type', '')
+    raw = f"{audience(request)}|{stamp}|{request.build_absolute_uri()}|{accepted}"
+    return RESPONSE_KEY.format(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def count(outcome):
+    # Exact on Redis/Memcached; the file cache's incr isn't atomic, so
+    # concurrent requests can lose a few counts there
+    key = STATS_KEY.format(outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def cache_stats():
+    stats = cache.get_many([STATS_KEY.format('hit'), STATS_KEY.format('miss')])
+    hits = stats.get(STATS_KEY.format('hit'), 0)
+    misses = stats.get(STATS_KEY.format('miss'), 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
+
+
+def file_cache():
+    # ``cache`` is a proxy; isinstance needs the backend itself
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    return backend if isinstance(backend, FileBasedCache) else None
+
+
+def lock_path(lock):
+    return os.path.join(file_cache()._dir, 'locks', hashlib.sha1(lock.encode()).hexdigest())
+
+
+def acquire_lock(lock, seconds):
+    """
+    Take ``lock`` for at most ``seconds``. Atomic on Redis, Memcached and
+    the local-memory cache through add(); the file cache's add() checks and
+    sets in two steps, so there the lock is a file created with O_EXCL.
+    """
+    if file_cache() is None:
+        return cache.add(lock, 1, seconds)
+    path = lock_path(lock)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            if lock_held(lock, seconds):
+                return False
+            # Left by a builder that died; take it over
+            release_lock(lock)
+    return False
+
+
+def lock_held(lock, seconds):
+    if file_cache() is None:
+        return cache.get(lock) is not None
+    try:
+        return time.time() - os.stat(lock_path(lock)).st_mtime < seconds
+    except FileNotFoundError:
+        return False
+
+
+def release_lock(lock):
+    if file_cache() is None:
+        cache.delete(lock)
+        return
+    try:
+        os.remove(lock_path(lock))
+    except FileNotFoundError:
+        pass
+
+
+def as_http_response(entry):
+    content, status, content_type, headers = entry
+    response = HttpResponse(content, status=status, content_type=content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def cached_response(key, build):
+    """
+    The cached response under ``key``, else ``build()`` rendered and stored.
+    Single flight: on a miss only the caller that takes the lock builds;
+    the others wait for its entry as long as the lock is held (it expires
+    after BLOG_RESPONSE_CACHE_LOCK_SECONDS), and only build one themselves
+    if the builder stored none. Only 200s are stored.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        count('hit')
+        return as_http_response(entry), 'HIT'
+
+    lock = LOCK_KEY.format(key)
+    # Expires on its own if the builder dies without releasing it
+    lock_seconds = getattr(settings, 'BLOG_RESPONSE_CACHE_LOCK_SECONDS', 10)
+    owner = acquire_lock(lock, lock_seconds)
+    if not owner:
+        while True:
+            time.sleep(LOCK_POLL_SECONDS)
+            # Released after the entry is stored, so a free lock is checked first
+            released = not lock_held(lock, lock_seconds)
+            entry = cache.get(key)
+            if entry is not None:
+                count('hit')
+                return as_http_response(entry), 'HIT'
+            if released:
+                # The builder gave up (error or non-200 response)
+                break
+
+    count('miss')
+    try:
+        response = build()
+        if response.status_code == 200:
+            headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+            entry = (response.content, response.status_code, response['Content-Type'], headers)
+            cache.set(key, entry, getattr(settings, 'BLOG_RESPONSE_CACHE_SECONDS', 60 * 60))
+    finally:
+        if owner:
+            release_lock(lock)
+    return response, 'MISS'
@@ -0,0 +1,184 @@
+import logging
+import os
+import tempfile
+import threading
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.renderers import JSONRenderer
+
+from core.workers import submit_thread
+
+from .models import BlogPost, Category
+from .pagination import PAGE_SIZE
+from .serializers import BlogPostListSerializer, BlogPostSerializer
+
+logger = logging.getLogger(__name__)
+
+# Changes waiting for the background export: (slugs, categories)
+_pending = (set(), set())
+_scheduled = False
+_lock = threading.Lock()
+
+
+class ExportRequest:
+    """
+    Stands in for the request in serializer context: an anonymous reader
+    with no query, and absolute URLs on BACKEND_URL as the API would build.
+    """
+    query_params = {}
+    user = AnonymousUser()
+
+    def build_absolute_uri(self, location=None):
+        return urljoin(getattr(settings, 'BACKEND_URL', '').rstrip('/') + '/', location or '')
+
+
+def export_dir():
+    return getattr(settings, 'BLOG_STATIC_EXPORT_DIR', os.path.join(settings.BASE_DIR, 'build', 'blog'))
+
+
+def export_url(path):
+    return getattr(settings, 'BLOG_STATIC_EXPORT_URL', '/blog-static/').rstrip('/') + '/' + path
+
+
+def page_size():
+    # The API's, so exported pages hold the same posts as its pages
+    return getattr(settings, 'BLOG_STATIC_EXPORT_PAGE_SIZE', None) or PAGE_SIZE
+
+
+def detail_path(slug):
+    return f"posts/{slug}.json"
+
+
+def page_path(collection, number):
+    return f"{collection}/page/{number}.json"
+
+
+def collections(categories=None):
+    """(directory, queryset) of the paged lists: every post, then each category."""
+    published = BlogPost.objects.filter(status='published').select_related('writer').defer('content')
+    yield 'posts', published
+    for category in Category.values if categories is None else categories:
+        yield f"categories/{category}", published.filter(category=category)
+
+
+class Exporter:
+    """
+    Writes the published blog as static JSON. A file is only rewritten when
+    its bytes change, so an unchanged file keeps its mtime (and its ETag
+    behind a proxy or CDN).
+    """
+
+    def __init__(self, root=None):
+        self.root = root or export_dir()
+        self.context = {'request': ExportRequest()}
+        self.renderer = JSONRenderer()
+        self.written = []
+        self.unchanged = 0
+        self.removed = []
+
+    def export_all(self):
+        slugs = set()
+        for post in BlogPost.objects.filter(status='published').select_related('writer').iterator():
+            self.write(detail_path(post.slug), BlogPostSerializer(post, context=self.context).data)
+            slugs.add(f"{post.slug}.json")
+        posts_dir = os.path.join(self.root, 'posts')
+        if os.path.isdir(posts_dir):
+            for entry in os.scandir(posts_dir):
+                if entry.is_file() and entry.name.endswith('.json') and entry.name not in slugs:
+                    self.remove(f"posts/{entry.name}")
+        for collection, queryset in collections():
+            self.export_collection(collection, queryset)
+
+    def export_changes(self, slugs, categories):
+        """Rewrite what posts ``slugs`` (in ``categories``, before and after the change) appear in."""
+        published = {
+            post.slug: post
+            for post in BlogPost.objects.filter(slug__in=slugs, status='published').select_related('writer')
+        }
+        for slug in slugs:
+            if slug in published:
+                self.write(detail_path(slug), BlogPostSerializer(published[slug], context=self.context).data)
+            else:
+                self.remove(detail_path(slug))
+        for collection, queryset in collections(categories):
+            self.export_collection(collection, queryset)
+
+    def export_collection(self, collection, queryset):
+        posts = list(queryset.order_by('-created_at', '-id'))
+        size = page_size()
+        pages = max(1, -(-len(posts) // size))
+        for number in range(1, pages + 1):
+            results = BlogPostListSerializer(posts[(number - 1) * size:number * size], many=True, context=self.context).data
+            self.write(page_path(collection, number), {
+                'count': len(posts),
+                'next': export_url(page_path(collection, number + 1)) if number < pages else None,
+                'previous': export_url(page_path(collection, number - 1)) if number > 1 else None,
+                'results': results,
+            })
+        # Pages past the end after posts were removed
+        number = pages + 1
+        while self.remove(page_path(collection, number)):
+            number += 1
+
+    def write(self, path, data):
+        content = self.renderer.render(data)
+        target = os.path.join(self.root, path)
+        try:
+            with open(target, 'rb') as f:
+                if f.read() == content:
+                    self.unchanged += 1
+                    return
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.partial')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(content)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.written.append(path)
+
+    def remove(self, path):
+        try:
+            os.remove(os.path.join(self.root, path))
+        except FileNotFoundError:
+            return False
+        self.removed.append(path)
+        return True
+
+
+def schedule_export(slugs, categories):
+    """
+    With BLOG_STATIC_EXPORT_ON_SAVE, rewrite what posts ``slugs`` (in
+    ``categories``) appear in on the background thread. Changes made while
+    an export is waiting are merged into it.
+    """
+    global _scheduled
+    if not getattr(settings, 'BLOG_STATIC_EXPORT_ON_SAVE', False):
+        return
+    with _lock:
+        _pending[0].update(slugs)
+        _pending[1].update(categories)
+        if _scheduled:
+            return
+        _scheduled = True
+    submit_thread(run_pending_export)
+
+
+def run_pending_export():
+    global _pending, _scheduled
+    with _lock:
+        (slugs, categories), _pending = _pending, (set(), set())
+        _scheduled = False
+    try:
+        Exporter().export_changes(slugs, categories)
+    except Exception:
+        logger.exception("Exporting blog posts %s failed", ', '.join(sorted(slugs)))
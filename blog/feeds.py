@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import io
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .models import BlogPost, Category, FeedDocument
+
+EMPTY_FEED_DATE = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class StableDateMixin:
+    # Django dates a feed without items now(), which would make every
+    # render of an empty category a new version
+    def latest_post_date(self):
+        return super().latest_post_date() if self.items else EMPTY_FEED_DATE
+
+
+class RssFeed(StableDateMixin, Rss201rev2Feed):
+    pass
+
+
+class AtomFeed(StableDateMixin, Atom1Feed):
+    pass
+
+
+FEED_FORMATS = {'rss': RssFeed, 'atom': AtomFeed}
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def site_url():
+    return getattr(settings, 'BLOG_SITE_URL', 'https://mapyourfreedom.com/blog').rstrip('/')
+
+
+def post_url(slug):
+    return f"{site_url()}/{slug}"
+
+
+def api_url(path):
+    # Where this backend serves the documents, for self links and the sitemap index
+    return getattr(settings, 'BACKEND_URL', '').rstrip('/') + '/api/blog/' + path
+
+
+def feed_name(kind, category=None):
+    return f"{kind}:{category}" if category else kind
+
+
+def sitemap_name(category=None):
+    return f"sitemap:{category}" if category else 'sitemap'
+
+
+def feed_path(kind, category=None):
+    return f"categories/{category}/feed.{kind}" if category else f"feed.{kind}"
+
+
+def sitemap_path(category=None):
+    return f"categories/{category}/sitemap.xml" if category else 'sitemap.xml'
+
+
+def published():
+    return BlogPost.objects.filter(status='published')
+
+
+def render_feed(kind, category=None):
+    posts = published().select_related('writer').defer('content').order_by('-created_at', '-id')
+    title = 'Map Your Freedom Blog'
+    link = site_url()
+    if category:
+        posts = posts.filter(category=category)
+        title = f"{title}: {Category(category).label}"
+        link = f"{link}?category={category}"
+
+    feed = FEED_FORMATS[kind](
+        title=title,
+        link=link,
+        description=title,
+        language=settings.LANGUAGE_CODE,
+        feed_url=api_url(feed_path(kind, category)),
+    )
+    for post in posts[:getattr(settings, 'BLOG_FEED_LENGTH', 50)]:
+        url = post_url(post.slug)
+        feed.add_item(
+            title=post.title,
+            link=url,
+            description=post.excerpt,
+            unique_id=url,
+            author_name=(post.writer.get_full_name() or post.writer.username) if post.writer else post.writer_name,
+            pubdate=post.created_at,
+            updateddate=post.updated_at,
+            categories=[Category(post.category).label],
+        )
+    return feed.writeString('utf-8').encode()
+
+
+def render_sitemap(category):
+    """The <urlset> of every published post in ``category``."""
+    output = io.StringIO()
+    xml = SimplerXMLGenerator(output, 'utf-8')
+    xml.startDocument()
+    xml.startElement('urlset', {'xmlns': SITEMAP_NAMESPACE})
+    entries = published().filter(category=category).order_by('-created_at', '-id').values_list('slug', 'updated_at')
+    for slug, updated_at in entries.iterator():
+        xml.startElement('url', {})
+        xml.addQuickElement('loc', post_url(slug))
+        xml.addQuickElement('lastmod', updated_at.isoformat(timespec='seconds'))
+        xml.endElement('url')
+    xml.endElement('urlset')
+    return output.getvalue().encode()
+
+
+def render_sitemap_index():
+    """The <sitemapindex> pointing at the sitemap of each category with posts."""
+    updated = dict(published().values_list('category').annotate(updated=Max('updated_at')).order_by())
+    output = io.StringIO()
+    xml = SimplerXMLGenerator(output, 'utf-8')
+    xml.startDocument()
+    xml.startElement('sitemapindex', {'xmlns': SITEMAP_NAMESPACE})
+    for category in Category.values:
+        if category in updated:
+            xml.startElement('sitemap', {})
+            xml.addQuickElement('loc', api_url(sitemap_path(category)))
+            xml.addQuickElement('lastmod', updated[category].isoformat(timespec='seconds'))
+            xml.endElement('sitemap')
+    xml.endElement('sitemapindex')
+    return output.getvalue().encode()
+
+
+def render(name):
+    kind, _, category = name.partition(':')
+    if kind == 'sitemap':
+        return render_sitemap(category) if category else render_sitemap_index()
+    return render_feed(kind, category or None)
+
+
+def store(name):
+    """
+    Render document ``name`` and save it gzipped. The row (and so its ETag
+    and Last-Modified) is only replaced when the content differs. Returns
+    (document, whether it changed).
+    """
+    content = render(name)
+    etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+    document = FeedDocument.objects.filter(name=name).first()
+    if document is not None and document.etag == etag:
+        return document, False
+    # mtime=0 keeps the gzip bytes a function of the content alone
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    document, _ = FeedDocument.objects.update_or_create(
+        name=name, defaults={'content': compressed, 'etag': etag, 'last_modified': timezone.now()},
+    )
+    return document, True
+
+
+def get_document(name):
+    """Stored document ``name``, rendered now if it was never built."""
+    return FeedDocument.objects.filter(name=name).first() or store(name)[0]
+
+
+def document_names(categories=None):
+    """Documents a change to posts in ``categories`` (None: all) can alter."""
+    categories = Category.values if categories is None else categories
+    names = [feed_name(kind) for kind in FEED_FORMATS]
+    for category in categories:
+        names += [feed_name(kind, category) for kind in FEED_FORMATS]
+        names.append(sitemap_name(category))
+    names.append(sitemap_name())
+    return names
+
+
+def refresh(categories=None):
+    """Re-render the documents posts in ``categories`` appear in; returns the names that changed."""
+    return [name for name in document_names(categories) if store(name)[1]]
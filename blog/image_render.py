@@ -0,0 +1,38 @@
+"""
+Resize blog images. Runs in the background worker processes, so it must
+not import Django or anything that needs the app registry.
+"""
+import io
+
+
+def render_derivatives(source, widths, formats, quality=80):
+    """
+    Encode ``source`` at each of ``widths`` (name -> pixels) in each of
+    ``formats``, never wider than the original. Returns a list of
+    (name, format, width, height, bytes).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+        rendered = []
+        for name, width in widths.items():
+            width = min(width, original.width)
+            height = max(1, round(original.height * width / original.width))
+            image = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+            for image_format in formats:
+                output = io.BytesIO()
+                if image_format == 'jpeg':
+                    # JPEG has no alpha: flatten onto white
+                    flat = image
+                    if image.mode == 'RGBA':
+                        flat = Image.new('RGB', image.size, (255, 255, 255))
+                        flat.paste(image, mask=image.getchannel('A'))
+                    flat.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+                else:
+                    image.save(output, image_format.upper(), quality=quality, method=4)
+                rendered.append((name, image_format, width, height, output.getvalue()))
+        return rendered
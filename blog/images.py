@@ -0,0 +1,124 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+
+from core.storage import get_media_storage
+from core.workers import submit_once
+
+from .cache import bump_list_version, bump_post_versions
+from .image_render import render_derivatives
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'blog_images/sizes'
+# Bump when the output of render_derivatives changes, to rebuild every image
+PIPELINE_VERSION = 1
+DEFAULT_SIZES = {'thumbnail': 320, 'card': 640, 'hero': 1600}
+FORMATS = ('webp', 'jpeg')
+
+
+def image_sizes():
+    return getattr(settings, 'BLOG_IMAGE_SIZES', DEFAULT_SIZES)
+
+
+def is_current(post):
+    """Whether ``post.image_derivatives`` were built from its current image."""
+    derivatives = post.image_derivatives or {}
+    return (
+        derivatives.get('source') == post.image.name
+        and derivatives.get('version') == PIPELINE_VERSION
+        and set(derivatives.get('sizes', {})) == set(image_sizes())
+    )
+
+
+def store_derivatives(post_id, source_name, rendered):
+    """
+    Save rendered images in the content-addressed media storage, so every
+    derivative gets an immutable name, and record them on the post. Written
+    with update() so saving a post doesn't schedule another round.
+    """
+    from .export import schedule_export
+    from .models import BlogPost
+
+    storage = get_media_storage()
+    sizes = {}
+    for name, image_format, width, height, data in rendered:
+        stored = storage.save(f"{DERIVATIVE_DIR}/{name}.{image_format}", ContentFile(data))
+        size = sizes.setdefault(name, {'width': width, 'height': height})
+        size[image_format] = stored
+    derivatives = {'source': source_name, 'version': PIPELINE_VERSION, 'sizes': sizes}
+    # Only if the image hasn't been replaced meanwhile
+    if BlogPost.objects.filter(pk=post_id, image=source_name).update(image_derivatives=derivatives):
+        # update() sends no post_save; cached responses and exported files
+        # still say null
+        post = BlogPost.objects.filter(pk=post_id).values('slug', 'category').first()
+        if post is not None:
+            bump_post_versions(post['slug'])
+            schedule_export({post['slug']}, {post['category']})
+        bump_list_version()
+    return derivatives
+
+
+def build_derivatives(post):
+    """Render and store the derivatives of ``post`` now, in this process."""
+    rendered = render_derivatives(post.image.path, image_sizes(), FORMATS)
+    post.image_derivatives = store_derivatives(post.pk, post.image.name, rendered)
+
+
+def schedule_derivatives(post):
+    """
+    Render the sizes of ``post``'s image in the background pool unless
+    they're current or already queued (see core.workers.submit_once).
+    """
+    if not post.image or is_current(post) or not os.path.exists(post.image.path):
+        return
+    post_id, source_name = post.pk, post.image.name
+
+    def rendered(future):
+        try:
+            store_derivatives(post_id, source_name, future.result())
+        except Exception:
+            logger.exception("Resizing the image of blog post %s failed", post_id)
+        finally:
+            # This thread isn't a request; don't leave its connection open
+            connection.close()
+
+    future = submit_once(
+        ('blog-image', post_id, source_name), render_derivatives, post.image.path, image_sizes(), FORMATS,
+    )
+    if future is not None:
+        future.add_done_callback(rendered)
+
+
+def image_variants(post, build_url):
+    """
+    The stored sizes of ``post``'s image for the API, or None until they
+    exist::
+
+        {'sizes': {'card': {'width': 640, 'height': 427, 'webp': url, 'jpeg': url}, ...},
+         'srcset': {'webp': 'url 320w, url 640w, ...', 'jpeg': ...}}
+    """
+    if not post.image or not is_current(post):
+        return None
+    storage = get_media_storage()
+    sizes = {}
+    for name, size in post.image_derivatives['sizes'].items():
+        sizes[name] = {'width': size['width'], 'height': size['height']}
+        for image_format in FORMATS:
+            sizes[name][image_format] = build_url(storage.url(size[image_format]))
+
+    by_width = sorted(sizes.values(), key=lambda size: size['width'])
+    srcset = {}
+    for image_format in FORMATS:
+        seen = set()
+        entries = []
+        for size in by_width:
+            # Small originals give several sizes the same width
+            if size['width'] not in seen:
+                seen.add(size['width'])
+                entries.append(f"{size[image_format]} {size['width']}w")
+        srcset[image_format] = ', '.join(entries)
+    return {'sizes': sizes, 'srcset': srcset}
@@ -0,0 +1,84 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blog.models import BlogPost
+from blog.search import FullTextSearchFilter
+from blog.views import BlogPostViewSet
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ?search= on the LIKE-based SearchFilter and the full-text index over a synthetic "
+        "archive; the posts are created in a transaction that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--words', type=int, default=200, help="Words per post")
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        vocabulary = [self.word(rng) for _ in range(5000)]
+        # Zipf-like: a few words are everywhere, most are rare
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        queries = [
+            vocabulary[0],
+            vocabulary[40],
+            vocabulary[3000],
+            f"{vocabulary[5]} {vocabulary[200]}",
+            vocabulary[1200][:4],
+        ]
+
+        with transaction.atomic():
+            self.stdout.write(f"Creating {options['posts']:,} posts...")
+            self.create_posts(options['posts'], options['words'], vocabulary, weights, rng)
+
+            self.stdout.write(f"{'query':<24} {'backend':<10} {'matches':>8} {'ms':>9}")
+            for query in queries:
+                for name, backend in (('like', filters.SearchFilter()), ('fulltext', FullTextSearchFilter())):
+                    matches, seconds = self.measure(backend, query, options['repeat'])
+                    self.stdout.write(f"{query:<24} {name:<10} {matches:>8,} {seconds * 1000:>9.1f}")
+
+            transaction.set_rollback(True)
+
+    def word(self, rng):
+        return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+
+    def create_posts(self, count, words, vocabulary, weights, rng):
+        batch = []
+        for number in range(count):
+            content = ' '.join(rng.choices(vocabulary, weights, k=words))
+            batch.append(BlogPost(
+                title=' '.join(rng.choices(vocabulary, weights, k=6)).capitalize(),
+                writer_name=f"Writer {number % 50}",
+                content=content,
+                slug=f"bench-{number}",
+                status='published',
+            ))
+            if len(batch) == 2000:
+                BlogPost.objects.bulk_create(batch)
+                batch = []
+        BlogPost.objects.bulk_create(batch)
+
+    def measure(self, backend, query, repeat):
+        """Best of ``repeat`` runs of what a list request does: a count and the first page."""
+        request = Request(APIRequestFactory().get('/api/blog/posts/', {'search': query}))
+        view = BlogPostViewSet()
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = backend.filter_queryset(request, BlogPost.objects.filter(status='published'), view)
+            matches = queryset.count()
+            list(queryset[:PAGE_SIZE])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return matches, best
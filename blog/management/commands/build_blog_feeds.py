@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.feeds import document_names, refresh
+
+
+class Command(BaseCommand):
+    help = "Render the blog RSS/Atom feeds and sitemaps, storing the ones that changed"
+
+    def handle(self, *args, **options):
+        changed = refresh()
+        for name in changed:
+            self.stdout.write(f"{name}: updated")
+        unchanged = len(document_names()) - len(changed)
+        self.stdout.write(self.style.SUCCESS(f"{len(changed)} updated, {unchanged} unchanged"))
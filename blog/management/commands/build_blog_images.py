@@ -0,0 +1,27 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from blog.images import build_derivatives, is_current
+from blog.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = "Build the resized WebP/JPEG copies of blog post images that are missing or out of date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild images that are already up to date")
+
+    def handle(self, *args, **options):
+        built = 0
+        for post in BlogPost.objects.exclude(image='').exclude(image__isnull=True).defer('content').iterator():
+            if not os.path.exists(post.image.path):
+                self.stderr.write(f"Missing image for post {post.slug}: {post.image.name}")
+                continue
+            if is_current(post) and not options['force']:
+                continue
+            build_derivatives(post)
+            built += 1
+            sizes = post.image_derivatives['sizes']
+            self.stdout.write(f"{post.slug}: " + ', '.join(f"{name} {size['width']}px" for name, size in sizes.items()))
+        self.stdout.write(self.style.SUCCESS(f"{built} image(s) built"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.export import Exporter, export_dir
+
+
+class Command(BaseCommand):
+    help = "Write the published blog list, category and post JSON to BLOG_STATIC_EXPORT_DIR, rewriting only changed files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Directory to write to instead of BLOG_STATIC_EXPORT_DIR")
+
+    def handle(self, *args, **options):
+        exporter = Exporter(options['output'] or export_dir())
+        exporter.export_all()
+        for path in exporter.written:
+            self.stdout.write(f"Wrote {path}")
+        for path in exporter.removed:
+            self.stdout.write(f"Removed {path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(exporter.written)} written, {exporter.unchanged} unchanged, {len(exporter.removed)} removed "
+            f"in {exporter.root}"
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 06:44
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.get_media_storage, upload_to='blog_images/'),
+        ),
+    ]
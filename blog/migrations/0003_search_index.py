@@ -0,0 +1,73 @@
+# Full-text index over title, writer_name and content, kept in sync by the
+# database on every insert, update and delete. SQLite rebuilds a table (and
+# drops its triggers) for most ALTERs, so a later migration that alters
+# blog_blogpost there has to create the triggers again.
+from django.db import migrations
+
+SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE blog_blogpost_fts USING fts5(
+        title, writer_name, content, content='blog_blogpost', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_blogpost_fts_insert AFTER INSERT ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(rowid, title, writer_name, content)
+        VALUES (new.id, new.title, new.writer_name, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_blogpost_fts_delete AFTER DELETE ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, writer_name, content)
+        VALUES ('delete', old.id, old.title, old.writer_name, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_blogpost_fts_update AFTER UPDATE OF title, writer_name, content ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, writer_name, content)
+        VALUES ('delete', old.id, old.title, old.writer_name, old.content);
+        INSERT INTO blog_blogpost_fts(rowid, title, writer_name, content)
+        VALUES (new.id, new.title, new.writer_name, new.content);
+    END
+    """,
+    # Index the posts that already exist
+    "INSERT INTO blog_blogpost_fts(blog_blogpost_fts) VALUES ('rebuild')",
+]
+
+POSTGRESQL_INDEX = [
+    """
+    ALTER TABLE blog_blogpost ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(writer_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX blog_blogpost_search ON blog_blogpost USING GIN (search_vector)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRESQL_INDEX}.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS blog_blogpost_fts_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS blog_blogpost_fts")
+    elif schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE blog_blogpost DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_media_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
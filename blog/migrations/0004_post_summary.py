@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-18 07:00
+
+import html
+import importlib
+import math
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Frozen copy of blog.models.summarize as of this migration, so later
+# changes to it don't change what this migration writes
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+
+def summarize(content):
+    text = ' '.join(html.unescape(strip_tags(content)).split())
+    word_count = len(text.split())
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    reading_time = max(1, math.ceil(word_count / WORDS_PER_MINUTE)) if word_count else 0
+    return excerpt, word_count, reading_time
+
+
+def restore_search_triggers(apps, schema_editor):
+    # SQLite adds (and removes) these columns by rebuilding blog_blogpost,
+    # which drops the full-text index triggers; the rows keep their ids, so
+    # the index itself is intact
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search_index = importlib.import_module('blog.migrations.0003_search_index')
+    for statement in search_index.SQLITE_INDEX:
+        if 'CREATE TRIGGER' in statement:
+            schema_editor.execute(statement.replace('CREATE TRIGGER', 'CREATE TRIGGER IF NOT EXISTS'))
+
+
+def fill_summaries(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    posts = []
+    for post in BlogPost.objects.only('pk', 'content').iterator():
+        post.excerpt, post.word_count, post.reading_time = summarize(post.content)
+        posts.append(post)
+    BlogPost.objects.bulk_update(posts, ['excerpt', 'word_count', 'reading_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_search_index'),
+    ]
+
+    operations = [
+        # Undoing the AddFields rebuilds the table again
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=280),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
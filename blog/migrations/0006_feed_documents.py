@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('content', models.BinaryField(help_text='Gzipped')),
+                ('etag', models.CharField(max_length=50)),
+                ('last_modified', models.DateTimeField()),
+            ],
+        ),
+    ]
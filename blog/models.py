@@ -1,9 +1,28 @@
+import html
+import math
+
 from django.db import models
-from django.utils.text import slugify
+from django.utils.html import strip_tags
+from django.utils.text import Truncator, slugify
 from django.contrib.auth import get_user_model
 
+from core.storage import get_media_storage
+
 User = get_user_model()
 
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+
+def summarize(content):
+    """(excerpt, word count, reading time in minutes) of a post's content."""
+    text = ' '.join(html.unescape(strip_tags(content)).split())
+    word_count = len(text.split())
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    reading_time = max(1, math.ceil(word_count / WORDS_PER_MINUTE)) if word_count else 0
+    return excerpt, word_count, reading_time
+
+
 class Category(models.TextChoices):
     BUSINESS = 'business', 'Business'
     WELLNESS = 'wellness', 'Wellness and Health'
@@ -30,10 +49,16 @@ class BlogPost(models.Model):
         default=Category.BUSINESS
     )
     content = models.TextField()
+    # Derived from content in save(), so list pages never need to load it
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Minutes")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
-    image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    image = models.ImageField(upload_to='blog_images/', storage=get_media_storage, blank=True, null=True)
+    # Resized copies of image, built in the background (see blog.images)
+    image_derivatives = models.JSONField(null=True, blank=True, editable=False)
     status = models.CharField(
         max_length=10,
         choices=[('draft', 'Draft'), ('published', 'Published')],
@@ -66,8 +91,24 @@ class BlogPost(models.Model):
                 
             self.slug = slug
         
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt, self.word_count, self.reading_time = summarize(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt', 'word_count', 'reading_time'}
+
         # Set writer_name if writer is provided but writer_name is not
         if self.writer and not self.writer_name:
             self.writer_name = self.writer.get_full_name() or self.writer.username
             
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class FeedDocument(models.Model):
+    """An RSS/Atom feed or sitemap, rendered and gzipped ahead of requests (see blog.feeds)."""
+    name = models.CharField(max_length=100, unique=True)
+    content = models.BinaryField(help_text="Gzipped")
+    etag = models.CharField(max_length=50)
+    last_modified = models.DateTimeField()
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,91 @@
+from django.db import connection
+from rest_framework import filters
+
+from core.search import MATCH_END, MATCH_START, fts5_expression, tsquery_expression
+
+SNIPPET_TOKENS = 24
+# Ids per snippet query, well under SQLite's bound parameter limit
+SNIPPET_BATCH = 500
+# Relevance weight of a match in title, writer_name and content
+FTS5_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` against the blog posts' full-text index instead of LIKE
+    scans: every word must match (the last as a prefix) and results come
+    best-first. A later ``?ordering=`` still takes precedence over relevance.
+    Snippets are left to attach_snippets, so they are only built for the
+    posts actually returned.
+    """
+
+    def get_search_query(self, request):
+        return ' '.join(self.get_search_terms(request))
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+        if connection.vendor == 'postgresql':
+            return self.filter_postgresql(queryset, query)
+        return self.filter_sqlite(queryset, query)
+
+    def filter_sqlite(self, queryset, query):
+        expression = fts5_expression(query)
+        if not expression:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=['blog_blogpost_fts'],
+            where=[f'{table}.id = +blog_blogpost_fts.rowid', 'blog_blogpost_fts MATCH %s'],
+            params=[expression],
+            select={'search_rank': 'bm25(blog_blogpost_fts, %s, %s, %s)'},
+            select_params=FTS5_WEIGHTS,
+        ).order_by('search_rank', '-created_at')
+
+    def filter_postgresql(self, queryset, query):
+        expression = tsquery_expression(query)
+        if not expression:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            where=[f"{table}.search_vector @@ to_tsquery('simple', %s)"],
+            params=[expression],
+            # Negated so that, as with bm25(), lower sorts first
+            select={'search_rank': f"-ts_rank({table}.search_vector, to_tsquery('simple', %s))"},
+            select_params=[expression],
+        ).order_by('search_rank', '-created_at')
+
+
+def attach_snippets(posts, query):
+    """
+    Set ``search_snippet`` on each of ``posts``: a piece of its content
+    around the matches of ``query``, with the matches between MATCH_START
+    and MATCH_END. One query per SNIPPET_BATCH posts.
+    """
+    by_id = {post.pk: post for post in posts}
+    ids = list(by_id)
+    if connection.vendor == 'postgresql':
+        expression = tsquery_expression(query)
+        options = f'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords={SNIPPET_TOKENS}, MinWords=8'
+        sql = (
+            "SELECT id, ts_headline('simple', content, to_tsquery('simple', %s), %s) "
+            "FROM blog_blogpost WHERE id IN ({})"
+        )
+        params = [expression, options]
+    else:
+        expression = fts5_expression(query)
+        sql = (
+            "SELECT rowid, snippet(blog_blogpost_fts, 2, %s, %s, '…', %s) "
+            "FROM blog_blogpost_fts WHERE blog_blogpost_fts MATCH %s AND rowid IN ({})"
+        )
+        params = [MATCH_START, MATCH_END, SNIPPET_TOKENS, expression]
+    if not expression:
+        return
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), SNIPPET_BATCH):
+            batch = ids[start:start + SNIPPET_BATCH]
+            cursor.execute(sql.format(', '.join(['%s'] * len(batch))), [*params, *batch])
+            for post_id, snippet in cursor.fetchall():
+                by_id[post_id].search_snippet = snippet
@@ -1,23 +1,57 @@
 from rest_framework import serializers
+
+from core.search import highlight
+
+from .images import image_variants
 from .models import BlogPost
+from .search import FullTextSearchFilter, attach_snippets
+
+
+class SearchResultListSerializer(serializers.ListSerializer):
+    """Builds the search snippets of a page of posts in one query."""
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        query = FullTextSearchFilter().get_search_query(request) if request else ''
+        if query and posts:
+            attach_snippets(posts, query)
+        return super().to_representation(posts)
+
 
 class BlogPostSerializer(serializers.ModelSerializer):
     writer_name = serializers.SerializerMethodField()
     category_display = serializers.CharField(source='get_category_display', read_only=True)
+    image_variants = serializers.SerializerMethodField()
+    search_snippet = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
         fields = [
             'id', 'title', 'writer', 'writer_name', 'category', 
             'category_display', 'content', 'created_at', 'updated_at', 
-            'slug', 'image', 'status'
+            'slug', 'image', 'image_variants', 'status', 'excerpt', 'word_count',
+            'reading_time', 'search_snippet'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'slug']
+        read_only_fields = ['created_at', 'updated_at', 'slug', 'excerpt', 'word_count', 'reading_time']
+        list_serializer_class = SearchResultListSerializer
     
     def get_writer_name(self, obj):
         if obj.writer:
             return obj.writer.get_full_name() or obj.writer.username
         return obj.writer_name
-    
 
-    
\ No newline at end of file
+    def get_image_variants(self, obj):
+        request = self.context.get('request')
+        return image_variants(obj, request.build_absolute_uri if request else str)
+
+    def get_search_snippet(self, obj):
+        # Only set on results of a ?search= query
+        return highlight(getattr(obj, 'search_snippet', None))
+
+
+class BlogPostListSerializer(BlogPostSerializer):
+    """List pages: the stored excerpt instead of the whole content."""
+
+    class Meta(BlogPostSerializer.Meta):
+        fields = [field for field in BlogPostSerializer.Meta.fields if field != 'content']
@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_list_version, bump_post_versions
+from .export import schedule_export
+from .feeds import refresh
+from .images import schedule_derivatives
+from .models import BlogPost
+
+
+@receiver(post_save, sender=BlogPost)
+def post_saved(sender, instance, **kwargs):
+    # Resize a new or replaced image once the row is visible to other threads
+    transaction.on_commit(lambda: schedule_derivatives(instance))
+
+
+@receiver(pre_save, sender=BlogPost)
+def remember_previous(sender, instance, **kwargs):
+    # A renamed or recategorized post must also leave its old URL and lists
+    instance._previous_slug = instance._previous_category = None
+    instance._previous_status = instance._previous_updated_at = None
+    if instance.pk:
+        previous = (
+            BlogPost.objects.filter(pk=instance.pk)
+            .values_list('slug', 'category', 'status', 'updated_at')
+            .first()
+        )
+        if previous:
+            (instance._previous_slug, instance._previous_category,
+             instance._previous_status, instance._previous_updated_at) = previous
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_responses(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)} - {None}
+
+    def bump():
+        bump_post_versions(*slugs)
+        bump_list_version()
+
+    # After commit, or a request in between could cache the old rows again
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def update_static_export(sender, instance, **kwargs):
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)} - {None}
+    categories = {instance.category, getattr(instance, '_previous_category', None)} - {None}
+    transaction.on_commit(lambda: schedule_export(slugs, categories))
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def refresh_feeds(sender, instance, **kwargs):
+    # Drafts appear in no feed or sitemap; a published post only when its
+    # status or updated_at moved (saves with update_fields may touch neither)
+    previous_status = getattr(instance, '_previous_status', None)
+    if 'published' not in (instance.status, previous_status):
+        return
+    if (kwargs.get('signal') is post_save and instance.status == previous_status
+            and instance.updated_at == getattr(instance, '_previous_updated_at', None)):
+        return
+    categories = {instance.category, getattr(instance, '_previous_category', None)} - {None}
+    transaction.on_commit(lambda: refresh(categories))
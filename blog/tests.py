@@ -1,3 +1,65 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import BlogPost
+from .pagination import PAGE_SIZE
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    SECURE_SSL_REDIRECT=False,
+)
+class BlogPostPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(12):
+            BlogPost.objects.create(title=f"Post {i}", content="Body", slug=f"post-{i}", status='published')
+        BlogPost.objects.create(title="Draft", content="Body", slug='draft', status='draft')
+        # Pairs share created_at, so pages must break ties on id
+        for i in range(12):
+            BlogPost.objects.filter(slug=f"post-{i}").update(created_at=now - timedelta(minutes=i // 2))
+        cls.expected = list(
+            BlogPost.objects.filter(status='published').order_by('-created_at', '-id').values_list('slug', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get_page(self, url):
+        # Only the page itself: no COUNT(*)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_next_and_previous_walk_every_published_post_once(self):
+        pages = []
+        url = '/api/blog/posts/'
+        while url:
+            page = self.get_page(url)
+            self.assertNotIn('count', page)
+            self.assertLessEqual(len(page['results']), PAGE_SIZE)
+            pages.append([post['slug'] for post in page['results']])
+            url = page['next']
+        self.assertEqual([slug for page in pages for slug in page], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        url = page['previous']
+        for expected in reversed(pages[:-1]):
+            page = self.get_page(url)
+            self.assertEqual([post['slug'] for post in page['results']], expected)
+            url = page['previous']
+        self.assertIsNone(url)
+
+    def test_search_falls_back_to_numbered_pages(self):
+        response = self.client.get('/api/blog/posts/', {'ordering': 'title'})
+        page = response.json()
+        self.assertEqual(page['count'], 12)
+        self.assertEqual(len(page['results']), PAGE_SIZE)
+        self.assertIsNotNone(page['next'])
@@ -1,10 +1,14 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import BlogPostViewSet
+from .views import BlogPostViewSet, feed, sitemap
 
 router = DefaultRouter()
 router.register(r'posts', BlogPostViewSet)
 
 urlpatterns = [
+    re_path(r'^feed\.(?P<kind>rss|atom)$', feed, name='blog-feed'),
+    re_path(r'^categories/(?P<category>[a-z]+)/feed\.(?P<kind>rss|atom)$', feed, name='blog-category-feed'),
+    path('sitemap.xml', sitemap, name='blog-sitemap'),
+    path('categories/<slug:category>/sitemap.xml', sitemap, name='blog-category-sitemap'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
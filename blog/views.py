@@ -1,7 +1,22 @@
+import gzip
+import re
+
+from django.conf import settings
 from rest_framework import viewsets, permissions, filters
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import BlogPost
-from .serializers import BlogPostSerializer
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from .cache import cache_stats, cached_response, response_cache_key
+from .feeds import feed_name, get_document, sitemap_name
+from .models import BlogPost, Category
+from .pagination import BlogPostCursorPagination, BlogPostPageNumberPagination
+from .search import FullTextSearchFilter
+from .serializers import BlogPostListSerializer, BlogPostSerializer
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.throttling import AnonRateThrottle
 
@@ -23,11 +38,25 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     serializer_class = BlogPostSerializer
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'status']
     search_fields = ['title', 'content', 'writer_name']
     ordering_fields = ['created_at', 'updated_at', 'title']
     throttle_classes = []  # disables throttling for this viewset
+    pagination_class = BlogPostCursorPagination
+
+    @property
+    def paginator(self):
+        # Relevance and ?ordering= orders aren't (created_at, id), so those
+        # lists keep page numbers
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            params = request.query_params if request is not None else {}
+            if any(params.get(param) for param in ('search', 'ordering')):
+                self._paginator = BlogPostPageNumberPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_queryset(self):
         # By default, only show published posts to anonymous users
@@ -37,11 +66,93 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         if not self.request.user.is_authenticated or not self.request.user.is_staff:
             queryset = queryset.filter(status='published')
             
+        if self.action == 'list':
+            # Full content only comes from the detail route
+            queryset = queryset.select_related('writer').defer('content')
         return queryset.order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(request, super().retrieve, *args, **kwargs)
+
+    def cached(self, request, render, *args, **kwargs):
+        """
+        Serve from the response cache, rendering on a miss. Entries are
+        per audience and are dropped by the BlogPost signals (see blog.cache).
+        """
+        def build():
+            response = self.finalize_response(request, render(request, *args, **kwargs), *args, **kwargs)
+            return response.render()
+
+        key = response_cache_key(request, kwargs.get(self.lookup_field))
+        response, outcome = cached_response(key, build)
+        response['X-Cache'] = outcome
+        return response
+
+    @action(['GET'], detail=False, url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(cache_stats())
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BlogPostListSerializer
+        return super().get_serializer_class()
     
     def perform_create(self, serializer):
         # Set writer to current user if not explicitly specified
         if not serializer.validated_data.get('writer'):
             serializer.save(writer=self.request.user)
         else:
-            serializer.save()
\ No newline at end of file
+            serializer.save()
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+FEED_CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'sitemap': 'application/xml; charset=utf-8',
+}
+
+
+def document_response(request, name, content_type):
+    """
+    Serve a pre-rendered feed or sitemap (see blog.feeds): gzipped as stored
+    when the client accepts it, with validators so crawlers get 304s.
+    """
+    document = get_document(name)
+    gzipped = bool(ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    # The gzipped bytes are a different representation, so a different ETag
+    etag = document.etag[:-1] + '-gzip"' if gzipped else document.etag
+    last_modified = int(document.last_modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content = bytes(document.content)
+        if gzipped:
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(content), content_type=content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'BLOG_FEED_MAX_AGE', 15 * 60)}"
+    return response
+
+
+def check_category(category):
+    if category is not None and category not in Category.values:
+        raise Http404("Unknown category")
+
+
+@require_safe
+def feed(request, kind, category=None):
+    check_category(category)
+    return document_response(request, feed_name(kind, category), FEED_CONTENT_TYPES[kind])
+
+
+@require_safe
+def sitemap(request, category=None):
+    check_category(category)
+    return document_response(request, sitemap_name(category), FEED_CONTENT_TYPES['sitemap'])
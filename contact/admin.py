@@ -1,12 +1,11 @@
 from django.contrib import admin
 from .models import ContactMessage
-from django.core.mail import send_mail
-from django.conf import settings
 from django.utils.html import format_html
 from django import forms
-from django.template.loader import render_to_string
-from email.mime.image import MIMEImage
+from django.template.defaultfilters import linebreaksbr
 import os
+from mailer.rendering import get_email_template
+from mailer.utils import enqueue_email
 
 class ContactMessageAdminForm(forms.ModelForm):
     reply_text = forms.CharField(
@@ -47,34 +46,23 @@ class ContactMessageAdmin(admin.ModelAdmin):
         reply_message = request.POST.get("reply_text", "").strip()
         if reply_message and not obj.replied:
             subject = f"Re: Your message to our website"
-            html_content = render_to_string(
+            template = get_email_template(
                 'contact/contact_admin_reply_email.html',
-                {
-                    'name': obj.name,
-                    'reply_message': reply_message,
-                }
+                fields=('name', 'reply_message'),
+                html_formatters={'reply_message': linebreaksbr},
             )
-            # Prepare the email
-            from django.core.mail import EmailMultiAlternatives
-            email = EmailMultiAlternatives(
-                subject,
-                '',  # plain text fallback
-                settings.DEFAULT_FROM_EMAIL,
-                [obj.email],
+            html_content, plain_content = template.render(name=obj.name, reply_message=reply_message)
+            enqueue_email(
+                subject=subject,
+                body=plain_content,  # plain text fallback
+                html_body=html_content,
+                to=[obj.email],
+                # Banner image as inline (CID), read by the worker at send time
+                attachments=[
+                    {'path': os.path.join('images', 'Map-Your_Freedom.jpeg'), 'cid': 'banner', 'filename': 'Map-Your_Freedom.jpeg'},
+                ],
             )
-            email.attach_alternative(html_content, "text/html")
-
-            # Attach the banner image as inline (CID)
-            banner_path = os.path.join(settings.MEDIA_ROOT, 'images', 'Map-Your_Freedom.jpeg')
-            if os.path.exists(banner_path):
-                with open(banner_path, 'rb') as img:
-                    banner_img = MIMEImage(img.read())
-                    banner_img.add_header('Content-ID', '<banner>')
-                    banner_img.add_header('Content-Disposition', 'inline', filename='Map-Your_Freedom.jpeg')
-                    email.attach(banner_img)
-
-            email.send(fail_silently=False)
             obj.replied = True
             obj.save()
-            self.message_user(request, "Reply sent successfully!")
+            self.message_user(request, "Reply queued for sending!")
         return super().response_change(request, obj)
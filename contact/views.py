@@ -4,15 +4,14 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.throttling import UserRateThrottle
-from django.core.mail import EmailMessage
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from email.mime.image import MIMEImage
 import os
 from django.conf import settings
 from .models import ContactMessage
 from .serializers import ContactMessageSerializer
-from auth_app.models import NotificationSettings  # or from core.models if that's where it is
+from auth_app.models import AdminNotification
+from auth_app.notifications import notify_admin
+from mailer.rendering import get_email_template
+from mailer.utils import enqueue_email
 
 class ContactThrottle(UserRateThrottle):
     scope = 'contact_submit'
@@ -36,10 +35,8 @@ class ContactViewSet(CreateModelMixin, GenericViewSet):
         # Save message with IP
         contact_message = serializer.save(ip_address=ip)
 
-        # Check notification setting before sending admin email
-        notify_setting = NotificationSettings.objects.first()
-        if not notify_setting or notify_setting.notify_contact:
-            self.send_notification_email(contact_message)
+        # NotificationSettings decides whether the admin email is sent now, digested or skipped
+        self.send_notification_email(contact_message)
         self.send_user_thank_you_email(contact_message)
 
         return Response(
@@ -73,21 +70,14 @@ You can manage this message in the admin panel.
         """
 
         try:
-            EmailMessage(
-                subject=subject,
-                body=email_body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[settings.ADMIN_EMAIL],
-            ).send(fail_silently=False)
+            notify_admin(AdminNotification.KIND_CONTACT, subject, email_body)
         except Exception as e:
-            print(f"Error sending notification email: {e}")
+            print(f"Error queueing notification email: {e}")
 
     def send_user_thank_you_email(self, message):
         subject = "Thanks for Reaching Out – We’ll Be in Touch Soon!"
-        context = {
-            "name": message.name,
-        }
-        html_content = render_to_string('contact/contact_thank_you_email.html', context)
+        template = get_email_template('contact/contact_thank_you_email.html', fields=('name',))
+        html_content, _ = template.render(name=message.name)
         text_content = f"""
 Hi {message.name},
 
@@ -104,21 +94,13 @@ Author, Coach & Crown Ambassador
 https://mapyourfreedom.com
         """
 
-        email = EmailMultiAlternatives(
+        enqueue_email(
             subject=subject,
             body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
+            html_body=html_content,
             to=[message.email],
+            # Banner image as inline (CID), read by the worker at send time
+            attachments=[
+                {'path': os.path.join('images', 'Map-Your_Freedom.jpeg'), 'cid': 'banner', 'filename': 'Map-Your_Freedom.jpeg'},
+            ],
         )
-        email.attach_alternative(html_content, "text/html")
-
-        # Attach banner image as inline (CID)
-        banner_path = os.path.join(settings.MEDIA_ROOT, 'images', 'Map-Your_Freedom.jpeg')
-        if os.path.exists(banner_path):
-            with open(banner_path, 'rb') as img:
-                banner_img = MIMEImage(img.read())
-                banner_img.add_header('Content-ID', '<banner>')
-                banner_img.add_header('Content-Disposition', 'inline', filename='Map-Your_Freedom.jpeg')
-                email.attach(banner_img)
-
-        email.send(fail_silently=False)
@@ -0,0 +1,17 @@
+import uuid
+
+from django.core.cache import cache
+
+
+def version_stamp(key):
+    """
+    The current value of the version stamp ``key``. A missing stamp (first
+    use, eviction) becomes a new random one, so a lost key can never bring
+    back a validator or cache entry built for an older version.
+    """
+    cache.add(key, uuid.uuid4().hex, None)
+    return cache.get(key) or ''
+
+
+def bump_version_stamps(*keys):
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
@@ -0,0 +1,122 @@
+import os
+import shutil
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.storage import INCOMING_DIR, file_digest, get_media_storage
+
+# File fields stored in the content-addressed media storage
+TRACKED_FIELDS = (
+    ('auth_app.Book', 'path'),
+    ('auth_app.User', 'profile_picture'),
+    ('blog.BlogPost', 'image'),
+)
+
+
+class Command(BaseCommand):
+    help = "Move files referenced by Book, User and BlogPost into the content-addressed store, one copy per distinct file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without touching anything")
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help="Also delete unreferenced files in the upload directories whose bytes are already stored",
+        )
+
+    def handle(self, *args, **options):
+        self.storage = get_media_storage()
+        self.dry_run = options['dry_run']
+        self.digests = {}
+        self.written = 0
+        self.created = set()
+
+        replaced = set()
+        stored = set()
+        upload_dirs = set()
+        for label, field_name in TRACKED_FIELDS:
+            model = apps.get_model(label)
+            field = model._meta.get_field(field_name)
+            directory = field.upload_to.strip('/') if isinstance(field.upload_to, str) else ''
+            upload_dirs.add(directory)
+            for obj in model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}).iterator():
+                name = getattr(obj, field_name).name
+                target = self.store(name, directory)
+                if target is None:
+                    continue
+                stored.add(target)
+                if target != name:
+                    self.stdout.write(f"{label} #{obj.pk}: {name} -> {target}")
+                    replaced.add(name)
+                    if not self.dry_run:
+                        setattr(obj, field_name, target)
+                        obj.save(update_fields=[field_name])
+
+        # On a dry run the rows still name the old files; count them as moved
+        referenced = (self.referenced_names() - replaced) | stored
+        removable = {name for name in replaced if name not in referenced}
+        if options['prune']:
+            stored_digests = {os.path.splitext(os.path.basename(name))[0] for name in stored}
+            for name in self.loose_files(upload_dirs):
+                if name not in referenced and self.digest(self.storage.path(name)) in stored_digests:
+                    removable.add(name)
+
+        freed = 0
+        for name in sorted(removable):
+            path = self.storage.path(name)
+            if not os.path.exists(path):
+                continue
+            freed += os.path.getsize(path)
+            self.stdout.write(f"Removing {name}")
+            if not self.dry_run:
+                os.remove(path)
+
+        prefix = "Would free" if self.dry_run else "Freed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(stored)} stored file(s), {len(removable)} file(s) removed. "
+            f"{prefix} {(freed - self.written) / 1024 / 1024:.1f} MB"
+        ))
+
+    def digest(self, path):
+        if path not in self.digests:
+            self.digests[path] = file_digest(path)
+        return self.digests[path]
+
+    def store(self, name, directory):
+        """Copy ``name`` to its blob (unless already there); return the blob name."""
+        path = self.storage.path(name)
+        if not os.path.exists(path):
+            self.stderr.write(f"Missing file: {name}")
+            return None
+
+        digest = self.digest(path)
+        extension = os.path.splitext(name)[1]
+        target = self.storage.blob_name(directory, digest, extension)
+        if target not in self.created and self.storage.find_blob(directory, digest, extension) is None:
+            self.created.add(target)
+            self.written += os.path.getsize(path)
+            if not self.dry_run:
+                target_path = self.storage.path(target)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                temp_path = f"{target_path}.partial"
+                shutil.copy2(path, temp_path)
+                os.replace(temp_path, target_path)
+        return target
+
+    def referenced_names(self):
+        names = set()
+        for label, field_name in TRACKED_FIELDS:
+            model = apps.get_model(label)
+            names.update(model.objects.exclude(**{field_name: ''}).values_list(field_name, flat=True))
+        return names
+
+    def loose_files(self, directories):
+        """Files directly inside the upload directories (blob shards excluded)."""
+        for directory in directories:
+            root = self.storage.path(directory)
+            if not os.path.isdir(root):
+                continue
+            for entry in os.scandir(root):
+                if entry.is_file() and entry.name != INCOMING_DIR:
+                    yield os.path.join(directory, entry.name).replace(os.sep, '/').lstrip('/')
@@ -0,0 +1,38 @@
+import html
+import re
+
+# Private-use markers around matches; the snippet is escaped before they
+# become <mark> tags, so indexed text can't inject markup
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+SEARCH_TERM = re.compile(r'\w+')
+
+
+def search_terms(query):
+    return SEARCH_TERM.findall(query)
+
+
+def fts5_expression(query):
+    """
+    FTS5 MATCH expression: every word of ``query`` must appear, the last
+    one may be a prefix. Quoting each word keeps FTS5 operators in user
+    input from being parsed.
+    """
+    quoted = ['"%s"' % term for term in search_terms(query)]
+    if quoted:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def tsquery_expression(query):
+    """The same query for PostgreSQL's to_tsquery()."""
+    terms = search_terms(query)
+    if terms:
+        terms[-1] += ':*'
+    return ' & '.join(terms)
+
+
+def highlight(snippet):
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
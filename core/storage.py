@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+INCOMING_DIR = '.incoming'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload under the SHA-256 of its bytes:
+    ``<upload_to>/<first two hex digits>/<digest><ext>``.
+
+    The digest is computed while the upload is streamed to a temporary file,
+    and the blob path doubles as the hash index: re-uploading a file that is
+    already stored costs one stat and keeps the existing blob, instead of
+    writing another copy with a random suffix. Blobs can be shared by
+    several rows, so they are never deleted along with a row.
+    """
+
+    def blob_name(self, directory, digest, extension):
+        return os.path.join(directory, digest[:2], f"{digest}{extension.lower()}").replace(os.sep, '/')
+
+    def find_blob(self, directory, digest, extension):
+        """Return the stored name for ``digest``, or None if it isn't stored yet."""
+        name = self.blob_name(directory, digest, extension)
+        return name if os.path.exists(self.path(name)) else None
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed in _save
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1]
+
+        incoming = os.path.join(self.location, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=incoming)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            name = self.blob_name(directory, digest.hexdigest(), extension)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                # Same bytes, same name: a concurrent upload of the same file
+                # replacing this one is harmless
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+def file_digest(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    return media_storage
@@ -1,6 +1,5 @@
 import os
 from django.contrib.auth import get_user_model
-from django.http import StreamingHttpResponse, HttpResponse
 from django.conf import settings
 from rest_framework import status
 from rest_framework.views import APIView
@@ -12,6 +11,8 @@ from djoser.views import UserViewSet
 from djoser.compat import get_user_email
 from djoser.conf import settings as djoser_settings
 
+from auth_app.delivery import serve_protected_file
+
 from .models import Book
 from .serializers import BookSerializer, CustomPasswordResetConfirmRetypeSerializer
 
@@ -73,19 +74,8 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_403_FORBIDDEN)
         
         try:
-            file = book.path.open('rb')
+            return serve_protected_file(request, book.path.path, 'application/pdf', book.name)
 
-            response = HttpResponse(content=file, status=status.HTTP_200_OK, content_type='application/pdf')
-            response['Content-Disposition'] = f"inline; filename={book.name}"
-            response['Content-Length'] = os.path.getsize(book.path.path)
-            response['Cache-Control'] = 'no-store, no-cache, must-revalidate, private'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-            response['X-Frame-Options'] = 'DENY'
-            response['Content-Security-Policy'] = "default-src 'none'; frame-ancestors 'none'"
-            
-            return response
-        
         except Exception as error:
             print(error)
 
@@ -0,0 +1,90 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import connections
+
+_executor = None
+_thread_executor = None
+# Jobs submitted through submit_once that haven't finished, by key
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    This process's pool for CPU-heavy background work (PDF rendering, image
+    resizing), so none of it runs on a request thread. Jobs must be
+    functions of modules that don't need Django.
+    """
+    global _executor
+    if _executor is None:
+        # Spawned, not forked: the web worker may be running threads
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def submit(func, *args, **kwargs):
+    try:
+        return get_executor().submit(func, *args, **kwargs)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool
+        reset_executor()
+        return get_executor().submit(func, *args, **kwargs)
+
+
+def submit_once(key, func, *args, **kwargs):
+    """
+    Submit ``func`` to the pool unless a job for ``key`` is already pending
+    in this process. Returns the new future, else None: the job is already
+    queued, or BACKGROUND_QUEUE_LIMIT jobs are pending (the caller tries
+    again later).
+    """
+    with _pending_lock:
+        if key in _pending or len(_pending) >= getattr(settings, 'BACKGROUND_QUEUE_LIMIT', 20):
+            return None
+        future = submit(func, *args, **kwargs)
+        _pending[key] = future
+    future.add_done_callback(lambda done: _finished(key))
+    return future
+
+
+def _finished(key):
+    with _pending_lock:
+        _pending.pop(key, None)
+
+
+def is_pending(key):
+    return key in _pending
+
+
+def _run_with_django(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # This thread isn't a request; don't leave its connections open
+        connections.close_all()
+
+
+def submit_thread(func, *args, **kwargs):
+    """
+    Run ``func`` on this process's background thread, for work that needs
+    Django (the ORM, serializers) but shouldn't hold up a request. Jobs
+    run one at a time, in the order submitted.
+    """
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='background')
+    return _thread_executor.submit(_run_with_django, func, args, kwargs)
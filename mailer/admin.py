@@ -0,0 +1,31 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to')
+    readonly_fields = (
+        'subject', 'body', 'html_body', 'from_email', 'to', 'attachments', 'attempts',
+        'claim_token', 'claimed_at', 'last_error', 'created_at', 'sent_at',
+    )
+    date_hierarchy = 'created_at'
+    actions = ['retry_now']
+
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+    recipients.short_description = 'To'
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_QUEUED,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            claim_token='',
+        )
+        self.message_user(request, f"{updated} email(s) queued for another attempt.")
+    retry_now.short_description = "Retry selected emails now"
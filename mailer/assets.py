@@ -0,0 +1,95 @@
+import copy
+import logging
+import mimetypes
+import os
+import threading
+import time
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.image import MIMEImage
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AssetCache:
+    """
+    Process-wide cache for files attached to outgoing mail (banner, logo,
+    mini-guide PDF).
+
+    Each file is read once and kept as ready-encoded MIME parts. An entry is
+    reloaded when the file's mtime changes; the mtime is checked at most once
+    every ``EMAIL_ASSET_CHECK_SECONDS`` so a burst of sends does no file I/O.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _check_interval(self):
+        return getattr(settings, 'EMAIL_ASSET_CHECK_SECONDS', 60)
+
+    def _entry(self, path):
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry and now - entry['checked_at'] < self._check_interval():
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(path)
+            mtime = os.stat(path).st_mtime
+            if entry and entry['mtime'] == mtime:
+                entry['checked_at'] = now
+                return entry
+
+            with open(path, 'rb') as asset_file:
+                content = asset_file.read()
+
+            entry = {'mtime': mtime, 'checked_at': now, 'content': content, 'parts': {}}
+            self._entries[path] = entry
+            logger.info(f"Email asset loaded: {path} ({len(content)} bytes)")
+            return entry
+
+    def read(self, path):
+        """Return the raw bytes of ``path``."""
+        return self._entry(path)['content']
+
+    def part(self, path, filename=None, cid=None):
+        """
+        Return a MIME part for ``path``: an inline image when ``cid`` is given,
+        an attachment otherwise. Callers get their own copy, so headers added
+        later do not leak into other messages.
+        """
+        entry = self._entry(path)
+        filename = filename or os.path.basename(path)
+        key = (filename, cid)
+
+        part = entry['parts'].get(key)
+        if part is None:
+            part = self._build_part(entry['content'], filename, cid)
+            entry['parts'][key] = part
+
+        return copy.deepcopy(part)
+
+    def _build_part(self, content, filename, cid):
+        if cid:
+            part = MIMEImage(content)
+            part.add_header('Content-ID', f"<{cid}>")
+            part.add_header('Content-Disposition', 'inline', filename=filename)
+            return part
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        maintype, subtype = mimetype.split('/', 1)
+        part = MIMEBase(maintype, subtype)
+        part.set_payload(content)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        return part
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+asset_cache = AssetCache()
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template, render_to_string
+from django.utils.html import strip_tags
+
+from mailer.rendering import clear_email_templates, get_email_template
+
+TEMPLATE_NAME = 'subscriber/welcome_email.html'
+FIELDS = ('first_name', 'full_name', 'email')
+STATIC_CONTEXT = {'site_name': 'Map Your Freedom', 'support_email': 'support@example.com'}
+
+
+class Command(BaseCommand):
+    help = "Compare renders per second of the Django template engine and compiled email templates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        recipients = [
+            {'first_name': f"Reader{i}", 'full_name': f"Reader{i} Example", 'email': f"reader{i}@example.com"}
+            for i in range(iterations)
+        ]
+
+        def engine_render(recipient):
+            html = render_to_string(TEMPLATE_NAME, dict(STATIC_CONTEXT, **recipient))
+            return html, strip_tags(html)
+
+        def engine_bulk(recipients):
+            # A batch loads (and parses) the template once
+            template = get_template(TEMPLATE_NAME)
+            for recipient in recipients:
+                html = template.render(dict(STATIC_CONTEXT, **recipient))
+                strip_tags(html)
+
+        def compiled_single(recipient):
+            # A single send looks the compiled template up every time
+            return get_email_template(TEMPLATE_NAME, FIELDS, STATIC_CONTEXT).render(**recipient)
+
+        def compiled_bulk(recipients):
+            template = get_email_template(TEMPLATE_NAME, FIELDS, STATIC_CONTEXT)
+            for recipient in recipients:
+                template.render(**recipient)
+
+        clear_email_templates()
+        results = [
+            ('single', 'engine', self.measure(lambda: [engine_render(r) for r in recipients])),
+            ('single', 'compiled', self.measure(lambda: [compiled_single(r) for r in recipients])),
+            ('bulk', 'engine', self.measure(lambda: engine_bulk(recipients))),
+            ('bulk', 'compiled', self.measure(lambda: compiled_bulk(recipients))),
+        ]
+
+        self.stdout.write(f"{iterations} renders of {TEMPLATE_NAME}")
+        for mode, renderer, seconds in results:
+            self.stdout.write(f"{mode:<7} {renderer:<9} {iterations / seconds:>12,.0f} renders/s")
+
+    def measure(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,50 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+
+from mailer.optimizer import optimize_template
+from mailer.rendering import built_template_path, clear_email_templates
+
+
+class Command(BaseCommand):
+    help = "Write optimized copies of the HTML email templates (inlined CSS, minified, CID images)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'templates',
+            nargs='*',
+            help="Template names to build (default: EMAIL_OPTIMIZED_TEMPLATES)",
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'EMAIL_TEMPLATE_BUILD_DIR', None):
+            raise CommandError("EMAIL_TEMPLATE_BUILD_DIR is not set")
+
+        names = options['templates'] or getattr(settings, 'EMAIL_OPTIMIZED_TEMPLATES', [])
+        inline_images = getattr(settings, 'EMAIL_INLINE_IMAGES', {})
+
+        for name in names:
+            try:
+                source_path = get_template(name).origin.name
+            except TemplateDoesNotExist:
+                raise CommandError(f"Template {name} not found")
+
+            with open(source_path, encoding='utf-8') as f:
+                source = f.read()
+            optimized, content_ids = optimize_template(source, inline_images, settings.MEDIA_URL)
+
+            path = built_template_path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(optimized)
+
+            saved = 100 - len(optimized.encode()) * 100 // max(len(source.encode()), 1)
+            self.stdout.write(f"{name}: {len(source.encode()):,} -> {len(optimized.encode()):,} bytes ({saved}% smaller)")
+            for content_id in sorted(content_ids):
+                self.stdout.write(f"  image rewritten to cid:{content_id}; the sender must attach it inline")
+
+        clear_email_templates()
+        self.stdout.write(self.style.SUCCESS(f"Built {len(names)} template(s) into {settings.EMAIL_TEMPLATE_BUILD_DIR}"))
@@ -0,0 +1,70 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from mailer.utils import claim_batch, deliver_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 20),
+            help="Number of messages claimed per round",
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'EMAIL_OUTBOX_POLL_SECONDS', 2),
+            help="Seconds to sleep when the outbox is empty",
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Drain the messages that are due now and exit",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        poll_interval = options['poll_interval']
+        # Longer-running jobs (e.g. bulk guide resends) handled between outbox rounds
+        jobs = [import_string(path) for path in getattr(settings, 'EMAIL_WORKER_JOBS', [])]
+
+        self.stdout.write("Email worker started")
+        try:
+            while True:
+                batch = claim_batch(batch_size)
+                if batch:
+                    sent, failed = deliver_batch(batch)
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                    continue
+
+                if self.run_jobs(jobs):
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            # Claimed rows that were not finished are released when their lease expires
+            pass
+
+        self.stdout.write("Email worker stopped")
+
+    def run_jobs(self, jobs):
+        """Run each job once; True if any did work. A failing job is logged, not fatal."""
+        worked = False
+        for job in jobs:
+            try:
+                worked = bool(job()) or worked
+            except Exception:
+                logger.exception("Email worker job %s.%s failed", job.__module__, job.__name__)
+        return worked
@@ -0,0 +1,303 @@
+"""
+Build-time clean-up of HTML email templates: CSS from <style> blocks is
+inlined into style attributes, comments and insignificant whitespace are
+dropped and local images are pointed at their inline (CID) attachment.
+
+Only what email clients can't do without a stylesheet is kept in <style>:
+rules with pseudo-classes (``:hover``), @-rules and selectors this module
+doesn't match (attribute selectors, ``>``/``+``/``~`` combinators).
+Django template syntax passes through untouched.
+"""
+import re
+from collections import OrderedDict
+
+STYLE_BLOCK = re.compile(r'<style\b[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+TAG = re.compile(r'<(/?)([a-zA-Z][\w-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+ATTRIBUTE = r'(\s{name}\s*=\s*)("([^"]*)"|\'([^\']*)\')'
+COMPOUND_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+)*)$')
+HTML_BLOCK = re.compile(r'({%\s*block\s+html_body\s*%})(.*?)({%\s*endblock(?:\s+html_body)?\s*%})', re.DOTALL)
+PRESERVED = re.compile(r'(<(pre|textarea)\b.*?</\2>|{%.*?%}|{{.*?}}|{#.*?#})', re.IGNORECASE | re.DOTALL)
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr',
+}
+BLOCK_ELEMENTS = (
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'div', 'p', 'h[1-6]', 'ul', 'ol', 'li',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'hr', 'br', 'center', 'blockquote', '!DOCTYPE',
+)
+BLOCK_TAG_SPACE = re.compile(
+    r'\s*(</?(?:%s)\b[^>]*>)\s*' % '|'.join(BLOCK_ELEMENTS), re.IGNORECASE
+)
+
+
+class Selector:
+    """A selector made of compound parts joined by descendant combinators."""
+
+    def __init__(self, parts):
+        self.parts = parts
+        ids = sum(len(part['ids']) for part in parts)
+        classes = sum(len(part['classes']) for part in parts)
+        tags = sum(1 for part in parts if part['tag'])
+        self.specificity = (ids, classes, tags)
+
+    @classmethod
+    def parse(cls, text):
+        """Return a Selector, or None when ``text`` can't be matched statically."""
+        parts = []
+        for compound in text.split():
+            match = COMPOUND_SELECTOR.match(compound)
+            if not match:
+                return None
+            tag, rest = match.groups()
+            parts.append({
+                'tag': None if tag in (None, '*') else tag.lower(),
+                'classes': set(re.findall(r'\.([\w-]+)', rest)),
+                'ids': set(re.findall(r'#([\w-]+)', rest)),
+            })
+        return cls(parts) if parts else None
+
+    @staticmethod
+    def _matches(part, element):
+        return (
+            (part['tag'] is None or part['tag'] == element['tag']) and
+            part['classes'] <= element['classes'] and
+            part['ids'] <= element['ids']
+        )
+
+    def matches(self, element, ancestors):
+        if not self._matches(self.parts[-1], element):
+            return False
+        remaining = self.parts[:-1]
+        for ancestor in reversed(ancestors):
+            if not remaining:
+                break
+            if self._matches(remaining[-1], ancestor):
+                remaining = remaining[:-1]
+        return not remaining
+
+
+def parse_declarations(text):
+    """Return [(property, value, important)] from a declaration block."""
+    declarations = []
+    for declaration in text.split(';'):
+        prop, _, value = declaration.partition(':')
+        prop, value = prop.strip().lower(), value.strip()
+        if not prop or not value:
+            continue
+        important = value.lower().endswith('!important')
+        if important:
+            value = value[:-len('!important')].strip()
+        # Style attributes are written with double quotes
+        declarations.append((prop, value.replace('"', "'"), important))
+    return declarations
+
+
+def _split_rules(css):
+    """Yield (prelude, body) for each top-level rule, keeping @-rule bodies whole."""
+    position = 0
+    while True:
+        start = css.find('{', position)
+        if start == -1:
+            return
+        depth, end = 0, start
+        while end < len(css):
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        yield css[position:start].strip(), css[start + 1:end]
+        position = end + 1
+
+
+def parse_stylesheet(css):
+    """
+    Split ``css`` into (rules, leftover): rules are (Selector, order,
+    declarations) that can be inlined, leftover is CSS that has to stay in
+    a <style> block.
+    """
+    rules = []
+    leftover = []
+    order = 0
+    for prelude, body in _split_rules(CSS_COMMENT.sub('', css)):
+        if prelude.startswith('@'):
+            leftover.append(f"{prelude}{{{minify_css(body)}}}")
+            continue
+        declarations = parse_declarations(body)
+        kept = []
+        for selector_text in prelude.split(','):
+            selector = Selector.parse(selector_text.strip())
+            if selector is None:
+                kept.append(selector_text.strip())
+            else:
+                rules.append((selector, order, declarations))
+                order += 1
+        if kept:
+            leftover.append(f"{','.join(kept)}{{{minify_css(body)}}}")
+    return rules, ''.join(leftover)
+
+
+def minify_css(css):
+    css = re.sub(r'\s+', ' ', CSS_COMMENT.sub('', css))
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.replace(';}', '}').strip().rstrip(';')
+
+
+def _get_attribute(attributes, name):
+    match = re.search(ATTRIBUTE.format(name=name), attributes, re.IGNORECASE)
+    if not match:
+        return None
+    return match.group(3) if match.group(3) is not None else match.group(4)
+
+
+def _set_attribute(attributes, name, value):
+    pattern = re.compile(ATTRIBUTE.format(name=name), re.IGNORECASE)
+    replacement = f' {name}="{value}"'
+    if pattern.search(attributes):
+        return pattern.sub(lambda match: replacement, attributes, count=1)
+    self_closing = attributes.rstrip().endswith('/')
+    if self_closing:
+        return attributes.rstrip()[:-1].rstrip() + replacement + ' /'
+    return attributes + replacement
+
+
+def _merge_style(matched, inline_style):
+    """
+    Cascade the matched rule declarations (sorted by specificity, then
+    order) and the element's own style attribute into one declaration list.
+    """
+    styles = OrderedDict()
+
+    def apply(declarations):
+        for prop, value, important in declarations:
+            current = styles.get(prop)
+            # !important from the stylesheet beats anything that isn't
+            if current and current[1] and not important:
+                continue
+            styles.pop(prop, None)
+            styles[prop] = (value, important)
+
+    for _, _, declarations in sorted(matched, key=lambda rule: (rule[0].specificity, rule[1])):
+        apply(declarations)
+    apply(parse_declarations(inline_style or ''))
+
+    return ';'.join(
+        f"{prop}:{value}{' !important' if important else ''}"
+        for prop, (value, important) in styles.items()
+    )
+
+
+def inline_css(html):
+    """Move the rules of every <style> block onto the elements they match."""
+    rules = []
+    leftover = []
+    for css in STYLE_BLOCK.findall(html):
+        block_rules, block_leftover = parse_stylesheet(css)
+        offset = len(rules)
+        rules.extend((selector, order + offset, declarations) for selector, order, declarations in block_rules)
+        if block_leftover:
+            leftover.append(block_leftover)
+
+    # Keep one <style> for what couldn't be inlined, where the first block was
+    placeholder = '\0style\0'
+    html = STYLE_BLOCK.sub(placeholder, html, count=1)
+    html = STYLE_BLOCK.sub('', html)
+    html = html.replace(placeholder, f"<style>{''.join(leftover)}</style>" if leftover else '')
+
+    if not rules:
+        return html
+
+    stack = []
+
+    def rewrite(match):
+        closing, tag, attributes = match.group(1), match.group(2).lower(), match.group(3)
+        if closing:
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index]['tag'] == tag:
+                    del stack[index:]
+                    break
+            return match.group(0)
+
+        element = {
+            'tag': tag,
+            'classes': set((_get_attribute(attributes, 'class') or '').split()),
+            'ids': set((_get_attribute(attributes, 'id') or '').split()),
+        }
+        matched = [rule for rule in rules if rule[0].matches(element, stack)]
+        if tag not in VOID_ELEMENTS and not attributes.rstrip().endswith('/'):
+            stack.append(element)
+        inline_style = _get_attribute(attributes, 'style')
+        if tag in ('html', 'head', 'title', 'meta', 'style') or not (matched or inline_style):
+            return match.group(0)
+
+        style = _merge_style(matched, inline_style)
+        return f"<{tag}{_set_attribute(attributes, 'style', style)}>"
+
+    return TAG.sub(rewrite, html)
+
+
+def minify_html(html):
+    """
+    Drop comments (conditional comments are kept) and collapse whitespace,
+    removing it around block-level tags. <pre>, <textarea> and template
+    tags are left as they are.
+    """
+    html = HTML_COMMENT.sub('', html)
+    pieces = PRESERVED.split(html)
+    # PRESERVED has two groups, so pieces cycle text, preserved, tag name
+    for index in range(0, len(pieces), 3):
+        text = re.sub(r'\s+', ' ', pieces[index])
+        pieces[index] = BLOCK_TAG_SPACE.sub(r'\1', text)
+    for index in range(2, len(pieces), 3):
+        pieces[index] = ''
+    return ''.join(pieces).strip()
+
+
+def rewrite_image_sources(html, inline_images, media_url='/media/'):
+    """
+    Point <img> tags at ``cid:<id>`` for images in ``inline_images``
+    ({path relative to MEDIA_ROOT: content id}). Returns (html, used ids).
+    """
+    used = set()
+
+    def content_id(src):
+        path = src
+        if media_url and path.startswith(media_url):
+            path = path[len(media_url):]
+        return inline_images.get(path.lstrip('/'))
+
+    def rewrite(match):
+        tag, attributes = match.group(2).lower(), match.group(3)
+        if match.group(1) or tag != 'img':
+            return match.group(0)
+        src = _get_attribute(attributes, 'src')
+        cid = content_id(src) if src else None
+        if not cid:
+            return match.group(0)
+        used.add(cid)
+        return f"<{match.group(2)}{_set_attribute(attributes, 'src', f'cid:{cid}')}>"
+
+    return TAG.sub(rewrite, html), used
+
+
+def optimize_html(html, inline_images=None, media_url='/media/'):
+    """Inline, rewrite and minify an HTML document. Returns (html, used content ids)."""
+    html, used = rewrite_image_sources(inline_css(html), inline_images or {}, media_url)
+    return minify_html(html), used
+
+
+def optimize_template(source, inline_images=None, media_url='/media/'):
+    """
+    Optimize a template's source. Templates with an ``html_body`` block
+    (the djoser/templated-mail layout) only have that block processed, so
+    the subject and plain-text blocks keep their line breaks.
+    """
+    match = HTML_BLOCK.search(source)
+    if not match:
+        return optimize_html(source, inline_images, media_url)
+    html, used = optimize_html(match.group(2), inline_images, media_url)
+    return source[:match.start(2)] + html + source[match.end(2):], used
@@ -0,0 +1,153 @@
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template, render_to_string
+from django.utils.html import conditional_escape, strip_tags
+
+MARKER_PATTERN = re.compile(r'\[\[myf:(\w+)\]\]')
+
+
+def marker(field):
+    return f"[[myf:{field}]]"
+
+
+def built_template_path(template_name):
+    build_dir = getattr(settings, 'EMAIL_TEMPLATE_BUILD_DIR', None)
+    return os.path.join(build_dir, template_name) if build_dir else None
+
+
+def file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+
+
+_built = {}
+
+
+def get_built_template(template_name):
+    """
+    Return the version of ``template_name`` written by
+    ``manage.py build_email_templates``, or None when there isn't one or the
+    source has been edited since it was built.
+    """
+    path = built_template_path(template_name)
+    try:
+        built_mtime = os.path.getmtime(path)
+        if built_mtime < os.path.getmtime(get_template(template_name).origin.name):
+            return None
+    except (OSError, TypeError):
+        return None
+
+    cached = _built.get(path)
+    if cached is None or cached[0] != built_mtime:
+        with open(path, encoding='utf-8') as f:
+            cached = (built_mtime, engines['django'].from_string(f.read()))
+        _built[path] = cached
+    return cached[1]
+
+
+class CompiledEmailTemplate:
+    """
+    An email template rendered once through the Django engine with a marker
+    in place of every per-recipient field. The HTML and its plain-text
+    version are kept as lists of static segments, so rendering for a
+    recipient is a join with that recipient's values. The HTML comes from
+    the optimized build of the template when there is a current one.
+
+    ``html_formatters`` maps a field to the function that turns its value
+    into HTML; values are HTML-escaped by default. Template filters applied
+    to a per-recipient field act on the marker, not the value, so such
+    fields should be formatted here instead.
+    """
+
+    def __init__(self, template_name, fields, context=None, html_formatters=None):
+        self.template_name = template_name
+        self.fields = tuple(fields)
+        self.html_formatters = html_formatters or {}
+        self.source_path = get_template(template_name).origin.name
+        self.built_path = built_template_path(template_name)
+        # Taken before reading, so a build written meanwhile shows as a change
+        self.versions = self.file_versions()
+        self.checked_at = time.monotonic()
+
+        context = dict(context or {}, **{field: marker(field) for field in self.fields})
+        html = render_to_string(template_name, context)
+        # The plain text comes from the source template, whose line breaks
+        # the optimized build has squeezed out.
+        self.text_segments = MARKER_PATTERN.split(strip_tags(html))
+
+        built = get_built_template(template_name)
+        if built is not None:
+            html = built.render(context)
+        self.html_segments = MARKER_PATTERN.split(html)
+
+    def file_versions(self):
+        return file_mtime(self.source_path), file_mtime(self.built_path)
+
+    def is_current(self):
+        """
+        Whether the source and built templates are unchanged since this was
+        compiled. The files are checked at most every EMAIL_ASSET_CHECK_SECONDS.
+        """
+        now = time.monotonic()
+        if now - self.checked_at < getattr(settings, 'EMAIL_ASSET_CHECK_SECONDS', 60):
+            return True
+        self.checked_at = now
+        return self.file_versions() == self.versions
+
+    def _join(self, segments, values):
+        # re.split puts captured field names at the odd positions
+        return ''.join(
+            values[part] if index % 2 else part
+            for index, part in enumerate(segments)
+        )
+
+    def render(self, **values):
+        """Return (html, text) for one recipient."""
+        text_values = {field: str(values.get(field, '')) for field in self.fields}
+        html_values = {
+            field: str(self.html_formatters.get(field, conditional_escape)(text_values[field]))
+            for field in self.fields
+        }
+        return self._join(self.html_segments, html_values), self._join(self.text_segments, text_values)
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def get_email_template(template_name, fields, context=None, html_formatters=None):
+    """
+    Return the CompiledEmailTemplate for ``template_name``, compiling it on
+    first use in this process. ``context`` holds the values that are the same
+    for every recipient. A template is recompiled when its source or its
+    build (``manage.py build_email_templates``) changes on disk, so running
+    workers pick up a new build without a restart; when DEBUG is on, on
+    every call.
+    """
+    key = (template_name, tuple(fields), tuple(sorted((context or {}).items())))
+    if settings.DEBUG:
+        return CompiledEmailTemplate(template_name, fields, context, html_formatters)
+
+    compiled = _compiled.get(key)
+    if compiled is None or not compiled.is_current():
+        with _lock:
+            current = _compiled.get(key)
+            # Unless another thread has recompiled it meanwhile
+            if current is None or current is compiled:
+                current = CompiledEmailTemplate(template_name, fields, context, html_formatters)
+                _compiled[key] = current
+            compiled = current
+    return compiled
+
+
+def clear_email_templates():
+    with _lock:
+        _compiled.clear()
+        _built.clear()
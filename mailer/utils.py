@@ -0,0 +1,167 @@
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .assets import asset_cache
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, to, html_body='', attachments=None, from_email=None):
+    """
+    Store an email in the outbox and return it. Nothing is sent here, so
+    request handlers can call this without waiting on the mail provider.
+
+    ``attachments`` is a list of dicts with a ``path`` (absolute or relative
+    to MEDIA_ROOT), an optional ``filename`` and, for inline images, a
+    ``cid`` that the HTML refers to as ``cid:<name>``.
+    """
+    if isinstance(to, str):
+        to = [to]
+
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        attachments=list(attachments or []),
+        max_attempts=getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+    )
+
+
+def resolve_attachment_path(path):
+    return os.path.join(settings.MEDIA_ROOT, path)
+
+
+def build_attachment(spec):
+    """Return the MIME part for an attachment spec, served from the shared asset cache."""
+    return asset_cache.part(
+        resolve_attachment_path(spec['path']),
+        filename=spec.get('filename'),
+        cid=spec.get('cid'),
+    )
+
+
+def build_message(outbound, connection=None):
+    """Turn an OutboundEmail row into a Django email message."""
+    email = EmailMultiAlternatives(
+        subject=outbound.subject,
+        body=outbound.body,
+        from_email=outbound.from_email,
+        to=outbound.to,
+        connection=connection,
+    )
+    if outbound.html_body:
+        email.attach_alternative(outbound.html_body, "text/html")
+
+    for spec in outbound.attachments:
+        try:
+            attachment = build_attachment(spec)
+        except OSError as error:
+            # A missing banner or guide should not hold back the whole message
+            logger.error(f"Attachment {spec.get('path')} skipped for outbound email {outbound.pk}: {error}")
+            continue
+
+        email.attach(attachment)
+
+    return email
+
+
+def _claimable():
+    now = timezone.now()
+    lease = getattr(settings, 'EMAIL_OUTBOX_LEASE_SECONDS', 300)
+    # Rows left in "sending" by a worker that died are picked up again once
+    # their lease runs out.
+    return (
+        Q(status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=now) |
+        Q(status=OutboundEmail.STATUS_SENDING, claimed_at__lt=now - timedelta(seconds=lease))
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to ``batch_size`` due messages as being sent by this worker and
+    return them. The conditional UPDATE makes the claim safe when several
+    workers poll the same table.
+    """
+    ids = list(
+        OutboundEmail.objects.filter(_claimable())
+        .order_by('next_attempt_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    OutboundEmail.objects.filter(_claimable(), pk__in=ids).update(
+        status=OutboundEmail.STATUS_SENDING,
+        claim_token=token,
+        claimed_at=timezone.now(),
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token).order_by('next_attempt_at'))
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 60)
+    cap = getattr(settings, 'EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def mark_sent(outbound):
+    outbound.status = OutboundEmail.STATUS_SENT
+    outbound.attempts += 1
+    outbound.sent_at = timezone.now()
+    outbound.last_error = ''
+    outbound.claim_token = ''
+    outbound.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'claim_token'])
+
+
+def mark_failed(outbound, error):
+    outbound.attempts += 1
+    outbound.last_error = str(error)
+    outbound.claim_token = ''
+    if outbound.attempts >= outbound.max_attempts:
+        outbound.status = OutboundEmail.STATUS_FAILED
+    else:
+        outbound.status = OutboundEmail.STATUS_QUEUED
+        outbound.next_attempt_at = timezone.now() + retry_delay(outbound.attempts)
+    outbound.save(update_fields=['status', 'attempts', 'last_error', 'claim_token', 'next_attempt_at'])
+
+
+def deliver_batch(batch):
+    """Send claimed messages over one backend connection. Returns (sent, failed)."""
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        logger.error(f"Could not open email connection: {error}")
+        for outbound in batch:
+            mark_failed(outbound, error)
+        return 0, len(batch)
+
+    try:
+        for outbound in batch:
+            try:
+                message = build_message(outbound, connection=connection)
+                if not connection.send_messages([message]):
+                    raise RuntimeError("Email backend reported that nothing was sent")
+            except Exception as error:
+                logger.error(f"Outbound email {outbound.pk} to {outbound.to} failed: {error}")
+                mark_failed(outbound, error)
+                failed += 1
+            else:
+                mark_sent(outbound)
+                sent += 1
+    finally:
+        connection.close()
+
+    return sent, failed
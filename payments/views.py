@@ -6,6 +6,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.decorators import throttle_classes
+from auth_app.catalog import bump_user_books_version
 from auth_app.models import Book
 from .models import Payment
 from .utils import create_checkout_session
@@ -86,6 +87,9 @@ def stripe_webhook(request):
         book = payment.book
         print("User before adding book:", user, list(user.books.all()))
         user.books.add(book)
+        # m2m_changed bumps it too; explicit so the grant never relies on the
+        # signal. Takes effect once the grant is committed.
+        bump_user_books_version(user.pk)
         print("User after adding book:", user, list(user.books.all()))  # Shows the user's books after granting access
         payment.save()
         user.save()
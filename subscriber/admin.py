@@ -1,13 +1,10 @@
 from django.contrib import admin
 from django.http import HttpResponse
 import csv
-from django.utils.html import format_html
-from .models import Subscriber
-from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
-import os
-from django.core.mail import EmailMessage
+from django.shortcuts import redirect
+from django.utils.html import format_html, format_html_join
+from .models import Broadcast, GuideResendJob, Subscriber
+from .emails import queue_welcome_email
 
 
 @admin.register(Subscriber)
@@ -61,54 +58,13 @@ class SubscriberAdmin(admin.ModelAdmin):
     mark_as_inactive.short_description = "Mark selected subscriber as inactive"
     
     def resend_guide(self, request, queryset):
-        count = 0
-        for subscriber in queryset:
-            self.send_welcome_email(subscriber)
-            count += 1
-        self.message_user(request, f"Mini-guide resent to {count} subscriber.")
+        # Runs in the email worker; the admin is sent to the progress page right away
+        subscriber_ids = list(queryset.values_list('pk', flat=True).iterator())
+        job = GuideResendJob.objects.create(subscriber_ids=subscriber_ids, total=len(subscriber_ids))
+        self.message_user(request, f"Mini-guide resend to {job.total} subscriber queued.")
+        return redirect('admin:subscriber_guideresendjob_change', job.pk)
     resend_guide.short_description = "Resend mini-guide to selected subscriber"
     
-    def send_welcome_email(self, subscriber):
-        """Send welcome email with mini-guide attachment"""
-        try:
-            # Context for email template
-            context = {
-                'first_name': subscriber.first_name,
-                'full_name': subscriber.full_name(),
-                'email': subscriber.email,
-                'site_name': getattr(settings.SITE_NAME, 'Our Website'),
-                'support_email': getattr(settings.SUPPORT_EMAIL, settings.DEFAULT_FROM_EMAIL),
-            }
-            
-            # Render email content
-            html_content = render_to_string('subscriber/welcome_email.html', context)
-            plain_content = strip_tags(html_content)
-            
-            # Create email
-            subject = f"Your Mini Guide Is Ready + Let’s Talk! "
-            email = EmailMessage(
-                subject=subject,
-                body=html_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[subscriber.email],
-            )
-            
-            # Add HTML content
-            email.content_subtype = "html"
-            
-            # Attach PDF
-            guide_path = os.path.join(settings.MEDIA_ROOT, 'guides', 'Map-Your-Freedom-Info-Mini-Guide.pdf')
-            if os.path.exists(guide_path):
-                email.attach_file(guide_path)
-            
-            # Send email
-            email.send(fail_silently=False)
-            return True
-            
-        except Exception as e:
-            print(f"Error sending welcome email: {e}")
-            return False
-    
     def get_urls(self):
         from django.urls import path
         urls = super().get_urls()
@@ -122,11 +78,63 @@ class SubscriberAdmin(admin.ModelAdmin):
         return custom_urls + urls
     
     def resend_guide_view(self, request, subscriber_id):
-        from django.shortcuts import redirect
         from django.contrib import messages
         
         subscriber = Subscriber.objects.get(pk=subscriber_id)
-        self.send_welcome_email(subscriber)
+        queue_welcome_email(subscriber)
         
-        messages.success(request, f"Mini-guide resent to {subscriber.email}.")
-        return redirect('admin:subscriber_subscriber_changelist')
\ No newline at end of file
+        messages.success(request, f"Mini-guide queued for {subscriber.email}.")
+        return redirect('admin:subscriber_subscriber_changelist')
+
+
+@admin.register(GuideResendJob)
+class GuideResendJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'status', 'progress_bar', 'sent', 'failed', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = (
+        'status', 'progress_bar', 'total', 'sent', 'failed', 'failure_list',
+        'last_subscriber_id', 'attempts', 'last_error', 'created_at', 'updated_at', 'finished_at',
+    )
+    exclude = ('subscriber_ids', 'failures')
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress_bar(self, obj):
+        return format_html(
+            '<progress value="{}" max="100"></progress> {}%',
+            obj.progress(),
+            obj.progress(),
+        )
+    progress_bar.short_description = 'Progress'
+
+    def failure_list(self, obj):
+        if not obj.failures:
+            return '-'
+        return format_html_join(
+            '', '<div>{}: {}</div>',
+            ((failure['email'], failure['error']) for failure in obj.failures)
+        )
+    failure_list.short_description = 'Failures'
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        response = super().change_view(request, object_id, form_url, extra_context)
+        job = self.get_object(request, object_id)
+        if job and job.status not in (GuideResendJob.STATUS_DONE, GuideResendJob.STATUS_FAILED):
+            # Keep the progress page fresh while the worker is sending
+            response['Refresh'] = '5'
+        return response
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'sent_count', 'throughput_display', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = (
+        'status', 'last_subscriber_id', 'sent_count', 'batch_count', 'send_seconds',
+        'throughput_display', 'created_at', 'started_at', 'finished_at',
+    )
+
+    def throughput_display(self, obj):
+        return f"{obj.throughput()}/s"
+    throughput_display.short_description = 'Throughput'
@@ -0,0 +1,222 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.template import Context, Template
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from .models import Broadcast, Subscriber
+
+logger = logging.getLogger(__name__)
+
+RECIPIENT_FIELDS = ('first_name', 'last_name', 'full_name', 'email')
+MARKUP_CHARACTERS = str.maketrans('', '', '<>"')
+
+
+def substitution_tag(field):
+    return f"%{field}%"
+
+
+def render_broadcast(broadcast):
+    """
+    Render the broadcast templates once, leaving a substitution tag (e.g.
+    ``%first_name%``) where each recipient's own value goes.
+    Returns (subject, html, text).
+    """
+    tags = {field: substitution_tag(field) for field in RECIPIENT_FIELDS}
+
+    subject = Template(broadcast.subject).render(Context(tags, autoescape=False))
+    html = Template(broadcast.html_body).render(Context(tags))
+    if broadcast.text_body:
+        text = Template(broadcast.text_body).render(Context(tags, autoescape=False))
+    else:
+        text = strip_tags(html)
+
+    return subject.strip(), html, text
+
+
+def recipient_substitutions(subscriber):
+    """Per-recipient values for the substitution tags of one subscriber row."""
+    values = {
+        'first_name': subscriber['first_name'],
+        'last_name': subscriber['last_name'],
+        'full_name': f"{subscriber['first_name']} {subscriber['last_name']}",
+        'email': subscriber['email'],
+    }
+    # The same value lands in the subject, text and HTML parts, so instead of
+    # HTML-escaping (which would show up as entities in the text) markup
+    # characters are dropped.
+    return {
+        substitution_tag(field): value.translate(MARKUP_CHARACTERS)
+        for field, value in values.items()
+    }
+
+
+class SendGridTransport:
+    """Sends one API request per batch, with one personalization per recipient."""
+
+    max_batch_size = 1000
+
+    def __init__(self):
+        from sendgrid import SendGridAPIClient
+
+        self.client = SendGridAPIClient(
+            settings.SENDGRID_API_KEY,
+            host=getattr(settings, 'BROADCAST_SENDGRID_HOST', 'https://api.sendgrid.com'),
+        )
+
+    def send_batch(self, subject, html, text, recipients):
+        self.client.send({
+            'personalizations': [
+                {'to': [{'email': recipient['email']}], 'substitutions': recipient['substitutions']}
+                for recipient in recipients
+            ],
+            'from': {'email': settings.DEFAULT_FROM_EMAIL},
+            'subject': subject,
+            'content': [
+                {'type': 'text/plain', 'value': text or ' '},
+                {'type': 'text/html', 'value': html},
+            ],
+        })
+
+    def close(self):
+        pass
+
+
+class EmailBackendTransport:
+    """
+    Applies the substitutions locally and hands the messages to
+    EMAIL_BACKEND over one connection. Used for local runs and tests with
+    the console, file or locmem backends.
+    """
+
+    max_batch_size = 1000
+
+    def __init__(self):
+        self.connection = get_connection(fail_silently=False)
+        self.connection.open()
+
+    def send_batch(self, subject, html, text, recipients):
+        messages = []
+        for recipient in recipients:
+            substitutions = recipient['substitutions']
+            message = EmailMultiAlternatives(
+                subject=self._substitute(subject, substitutions),
+                body=self._substitute(text, substitutions),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[recipient['email']],
+                connection=self.connection,
+            )
+            message.attach_alternative(self._substitute(html, substitutions), "text/html")
+            messages.append(message)
+        self.connection.send_messages(messages)
+
+    def _substitute(self, content, substitutions):
+        for tag, value in substitutions.items():
+            content = content.replace(tag, value)
+        return content
+
+    def close(self):
+        self.connection.close()
+
+
+class RateLimiter:
+    """Spaces out batches so no more than ``per_second`` recipients are sent per second."""
+
+    def __init__(self, per_second):
+        self.per_second = per_second
+        self.available_at = time.monotonic()
+
+    def wait(self, count):
+        if not self.per_second:
+            return
+        now = time.monotonic()
+        if now < self.available_at:
+            time.sleep(self.available_at - now)
+        self.available_at = max(now, self.available_at) + count / self.per_second
+
+
+def get_transport(path=None):
+    path = path or getattr(settings, 'BROADCAST_TRANSPORT', 'subscriber.broadcast.SendGridTransport')
+    return import_string(path)()
+
+
+def send_broadcast(broadcast, transport, batch_size=None, sends_per_second=None, progress=None):
+    """
+    Send ``broadcast`` to every active subscriber it has not reached yet.
+
+    Subscribers are read in primary-key order, one batch at a time, and the
+    checkpoint is saved after every batch, so a crashed run resumes after the
+    last subscriber that was handed to the transport. A crash between a
+    successful API call and its checkpoint resends that one batch.
+    """
+    if broadcast.status == Broadcast.STATUS_DONE:
+        return broadcast
+
+    sends_per_second = sends_per_second or broadcast.sends_per_second or getattr(settings, 'BROADCAST_SENDS_PER_SECOND', None)
+    batch_size = min(
+        batch_size or getattr(settings, 'BROADCAST_BATCH_SIZE', 1000),
+        transport.max_batch_size,
+    )
+    if sends_per_second:
+        # Keep each API call within one second's worth of sends
+        batch_size = max(1, min(batch_size, sends_per_second))
+    max_retries = getattr(settings, 'BROADCAST_MAX_RETRIES', 3)
+
+    subject, html, text = render_broadcast(broadcast)
+    limiter = RateLimiter(sends_per_second)
+
+    Broadcast.objects.filter(pk=broadcast.pk).update(
+        status=Broadcast.STATUS_SENDING,
+        started_at=broadcast.started_at or timezone.now(),
+    )
+
+    checkpoint_at = time.monotonic()
+    while True:
+        subscribers = list(
+            Subscriber.objects.filter(is_active=True, pk__gt=broadcast.last_subscriber_id)
+            .order_by('pk')
+            .values('pk', 'email', 'first_name', 'last_name')[:batch_size]
+        )
+        if not subscribers:
+            break
+
+        recipients = [
+            {'email': subscriber['email'], 'substitutions': recipient_substitutions(subscriber)}
+            for subscriber in subscribers
+        ]
+
+        limiter.wait(len(recipients))
+        for attempt in range(max_retries + 1):
+            try:
+                transport.send_batch(subject, html, text, recipients)
+                break
+            except Exception as error:
+                if attempt == max_retries:
+                    raise
+                logger.warning(f"Broadcast {broadcast.pk} batch failed, retrying: {error}")
+                time.sleep(2 ** attempt)
+
+        now = time.monotonic()
+        Broadcast.objects.filter(pk=broadcast.pk).update(
+            last_subscriber_id=subscribers[-1]['pk'],
+            sent_count=F('sent_count') + len(recipients),
+            batch_count=F('batch_count') + 1,
+            send_seconds=F('send_seconds') + (now - checkpoint_at),
+        )
+        checkpoint_at = now
+        broadcast.refresh_from_db()
+
+        if progress:
+            progress(broadcast, len(recipients))
+
+    Broadcast.objects.filter(pk=broadcast.pk).update(
+        status=Broadcast.STATUS_DONE,
+        finished_at=timezone.now(),
+    )
+    broadcast.refresh_from_db()
+    return broadcast
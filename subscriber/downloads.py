@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+GUIDE_PATH = os.path.join('guides', 'Map-Your-Freedom-Info-Mini-Guide.pdf')
+GUIDE_FILENAME = 'Map-Your-Freedom-Info-Mini-Guide.pdf'
+GUIDE_SIGNING_SALT = 'subscriber.guide-download'
+
+
+def guide_signer():
+    return signing.TimestampSigner(salt=GUIDE_SIGNING_SALT)
+
+
+def make_guide_token(subscriber):
+    return guide_signer().sign(str(subscriber.pk))
+
+
+def check_guide_token(token):
+    """
+    Return the subscriber id a token was issued for. Raises
+    signing.SignatureExpired or signing.BadSignature; the database is not
+    touched either way.
+    """
+    max_age = getattr(settings, 'MINI_GUIDE_LINK_MAX_AGE', 60 * 60 * 24 * 30)
+    return guide_signer().unsign(token, max_age=max_age)
+
+
+def guide_download_url(subscriber):
+    base_url = getattr(settings, 'BACKEND_URL', '').rstrip('/')
+    return base_url + reverse('subscriber-guide-download', args=[make_guide_token(subscriber)])
+
+
+def guide_file_path():
+    return os.path.join(settings.MEDIA_ROOT, GUIDE_PATH)
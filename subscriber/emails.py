@@ -0,0 +1,203 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from mailer.rendering import get_email_template
+from mailer.utils import build_attachment, enqueue_email
+from .downloads import GUIDE_PATH, guide_download_url
+from .models import GuideResendJob, Subscriber
+
+logger = logging.getLogger(__name__)
+
+WELCOME_SUBJECT = "Your Mini Guide Is Ready + Let's Talk!"
+
+DELIVERY_ATTACHMENT = 'attachment'
+DELIVERY_LINK = 'link'
+
+BANNER_ATTACHMENT = {
+    'path': os.path.join('images', 'Map-Your_Freedom.jpeg'), 'cid': 'banner', 'filename': 'Map-Your_Freedom.jpeg',
+}
+
+# Read from MEDIA_ROOT through the shared asset cache when the message is built
+WELCOME_ATTACHMENTS = [
+    {'path': os.path.join('images', 'Map-Your_Freedom.jpeg'), 'cid': 'logo', 'filename': 'logo.jpg'},
+    {'path': GUIDE_PATH},
+    BANNER_ATTACHMENT,
+]
+# Link mode only carries the image the template shows; the guide is downloaded
+WELCOME_LINK_ATTACHMENTS = [BANNER_ATTACHMENT]
+
+
+def guide_delivery():
+    """MINI_GUIDE_DELIVERY: 'attachment' (the PDF in every email) or 'link' (a signed download link)."""
+    return getattr(settings, 'MINI_GUIDE_DELIVERY', DELIVERY_ATTACHMENT)
+
+
+def welcome_attachments():
+    return WELCOME_LINK_ATTACHMENTS if guide_delivery() == DELIVERY_LINK else WELCOME_ATTACHMENTS
+
+
+def render_welcome_email(subscriber):
+    """Return the (html, plain text) bodies of the welcome email."""
+    link_mode = guide_delivery() == DELIVERY_LINK
+    template = get_email_template(
+        'subscriber/welcome_email.html',
+        fields=('first_name', 'full_name', 'email', 'guide_url'),
+        context={
+            'site_name': getattr(settings, 'SITE_NAME', 'Our Website'),
+            'support_email': getattr(settings, 'SUPPORT_EMAIL', settings.DEFAULT_FROM_EMAIL),
+            'guide_link': link_mode,
+        },
+    )
+    return template.render(
+        first_name=subscriber.first_name,
+        full_name=subscriber.full_name(),
+        email=subscriber.email,
+        guide_url=guide_download_url(subscriber) if link_mode else '',
+    )
+
+
+def queue_welcome_email(subscriber):
+    """Put the welcome email with the mini-guide in the outbox."""
+    html_content, plain_content = render_welcome_email(subscriber)
+    return enqueue_email(
+        subject=WELCOME_SUBJECT,
+        body=plain_content,
+        html_body=html_content,
+        to=[subscriber.email],
+        attachments=welcome_attachments(),
+    )
+
+
+def build_welcome_message(subscriber, attachments, connection=None):
+    """Build the welcome email with already-built MIME parts, shared (not copied) between messages."""
+    html_content, plain_content = render_welcome_email(subscriber)
+    email = EmailMultiAlternatives(
+        subject=WELCOME_SUBJECT,
+        body=plain_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[subscriber.email],
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    for attachment in attachments:
+        email.attach(attachment)
+    return email
+
+
+def send_welcome_emails(subscribers, connection):
+    """
+    Send the welcome email to ``subscribers`` over an open ``connection``.
+    Returns (sent, failures) where failures is a list of {email, error}.
+    """
+    attachments = []
+    for spec in welcome_attachments():
+        try:
+            attachments.append(build_attachment(spec))
+        except OSError as error:
+            logger.error(f"Attachment {spec['path']} skipped for guide resend: {error}")
+
+    messages = []
+    failures = []
+    for subscriber in subscribers:
+        try:
+            messages.append(build_welcome_message(subscriber, attachments, connection))
+        except Exception as error:
+            failures.append({'email': subscriber.email, 'error': str(error)})
+
+    # One message per call on the shared connection: a batch call would stop
+    # at the first error without saying which recipients already got theirs.
+    sent = 0
+    for message in messages:
+        try:
+            if not connection.send_messages([message]):
+                raise RuntimeError("Email backend reported that nothing was sent")
+            sent += 1
+        except Exception as error:
+            failures.append({'email': message.to[0], 'error': str(error)})
+
+    return sent, failures
+
+
+def run_guide_resend_chunk(job):
+    """
+    Send the next chunk of a claimed GuideResendJob over one connection,
+    save the progress and release the job; marks it done after the last.
+    """
+    chunk_size = getattr(settings, 'GUIDE_RESEND_CHUNK_SIZE', 100)
+    max_failures = getattr(settings, 'GUIDE_RESEND_MAX_RECORDED_FAILURES', 500)
+
+    ids = sorted(pk for pk in job.subscriber_ids if pk > job.last_subscriber_id)
+    chunk = ids[:chunk_size]
+    if chunk:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        try:
+            subscribers = Subscriber.objects.filter(pk__in=chunk).order_by('pk').iterator(chunk_size=chunk_size)
+            sent, failures = send_welcome_emails(subscribers, connection)
+        finally:
+            connection.close()
+        job.sent += sent
+        job.failed += len(failures)
+        job.failures = (job.failures + failures)[:max_failures]
+        job.last_subscriber_id = chunk[-1]
+
+    job.attempts = 0
+    job.leased_until = None
+    update_fields = ['sent', 'failed', 'failures', 'last_subscriber_id', 'attempts', 'leased_until', 'updated_at']
+    if len(ids) <= chunk_size:
+        job.status = GuideResendJob.STATUS_DONE
+        job.finished_at = timezone.now()
+        update_fields += ['status', 'finished_at']
+    job.save(update_fields=update_fields)
+    if job.status == GuideResendJob.STATUS_DONE:
+        logger.info(f"Guide resend #{job.pk} finished: {job.sent} sent, {job.failed} failed")
+
+
+def run_pending_guide_resends():
+    """
+    Email worker hook: claim the oldest unfinished resend job and send its
+    next chunk, so outbox mail keeps going out between chunks. Returns True
+    when a chunk was processed.
+
+    A chunk that raises leaves the job leased: it is claimed again from its
+    checkpoint once the lease expires. After GUIDE_RESEND_MAX_ATTEMPTS
+    claims in a row without a chunk going through, it is marked failed.
+    """
+    now = timezone.now()
+    lease = getattr(settings, 'EMAIL_OUTBOX_LEASE_SECONDS', 300)
+    claimable = (
+        Q(status__in=[GuideResendJob.STATUS_QUEUED, GuideResendJob.STATUS_RUNNING]) &
+        (Q(leased_until__isnull=True) | Q(leased_until__lt=now))
+    )
+    job = GuideResendJob.objects.filter(claimable).order_by('created_at').first()
+    if job is None:
+        return False
+
+    claimed = GuideResendJob.objects.filter(claimable, pk=job.pk).update(
+        status=GuideResendJob.STATUS_RUNNING,
+        leased_until=now + timedelta(seconds=lease),
+        updated_at=now,
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return False
+
+    job.refresh_from_db()
+    try:
+        run_guide_resend_chunk(job)
+    except Exception as error:
+        job.last_error = str(error)
+        update_fields = ['last_error', 'updated_at']
+        if job.attempts >= getattr(settings, 'GUIDE_RESEND_MAX_ATTEMPTS', 3):
+            job.status = GuideResendJob.STATUS_FAILED
+            job.finished_at = timezone.now()
+            update_fields += ['status', 'finished_at']
+        job.save(update_fields=update_fields)
+        raise
+    return True
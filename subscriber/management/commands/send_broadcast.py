@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from subscriber.broadcast import get_transport, send_broadcast
+from subscriber.models import Broadcast
+
+
+class Command(BaseCommand):
+    help = "Send a broadcast to all active subscribers, resuming from its last checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('broadcast_id', type=int)
+        parser.add_argument(
+            '--sends-per-second',
+            type=int,
+            help="Override the broadcast's rate limit",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="Recipients per API call (at most 1000 for SendGrid)",
+        )
+        parser.add_argument(
+            '--transport',
+            help="Dotted path of the transport class, e.g. subscriber.broadcast.EmailBackendTransport",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            broadcast = Broadcast.objects.get(pk=options['broadcast_id'])
+        except Broadcast.DoesNotExist:
+            raise CommandError(f"Broadcast {options['broadcast_id']} does not exist")
+
+        if broadcast.status == Broadcast.STATUS_DONE:
+            self.stdout.write(f"Broadcast {broadcast.pk} was already sent to {broadcast.sent_count} subscribers")
+            return
+
+        if broadcast.last_subscriber_id:
+            self.stdout.write(f"Resuming after subscriber {broadcast.last_subscriber_id} ({broadcast.sent_count} already sent)")
+
+        def progress(broadcast, batch):
+            self.stdout.write(
+                f"Batch {broadcast.batch_count}: {batch} recipients, "
+                f"{broadcast.sent_count} sent, {broadcast.throughput()}/s"
+            )
+
+        transport = get_transport(options['transport'])
+        try:
+            broadcast = send_broadcast(
+                broadcast,
+                transport,
+                batch_size=options['batch_size'],
+                sends_per_second=options['sends_per_second'],
+                progress=progress,
+            )
+        except Exception as error:
+            raise CommandError(f"Broadcast stopped, run the command again to resume: {error}")
+        finally:
+            transport.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Broadcast {broadcast.pk} sent to {broadcast.sent_count} subscribers "
+            f"in {broadcast.batch_count} batches, {broadcast.send_seconds:.1f}s, {broadcast.throughput()}/s"
+        ))
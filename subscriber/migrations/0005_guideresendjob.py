@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriber', '0004_alter_subscriber_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GuideResendJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscriber_ids', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done')], default='queued', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('failures', models.JSONField(blank=True, default=list, help_text='Recipients that could not be sent to, with the error')),
+                ('last_subscriber_id', models.BigIntegerField(default=0, help_text='Checkpoint: highest subscriber id already processed')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Guide Resend',
+                'verbose_name_plural': 'Guide Resends',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
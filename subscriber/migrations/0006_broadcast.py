@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriber', '0005_guideresendjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('html_body', models.TextField()),
+                ('text_body', models.TextField(blank=True, help_text='Plain-text version. Generated from the HTML when empty')),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('sending', 'Sending'), ('done', 'Done')], default='draft', max_length=10)),
+                ('sends_per_second', models.PositiveIntegerField(blank=True, help_text='Rate limit for this broadcast. Uses BROADCAST_SENDS_PER_SECOND when empty', null=True)),
+                ('last_subscriber_id', models.BigIntegerField(default=0, help_text='Checkpoint: highest subscriber id already sent')),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('batch_count', models.PositiveIntegerField(default=0)),
+                ('send_seconds', models.FloatField(default=0, help_text='Time spent sending, excluding pauses between runs')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Broadcast',
+                'verbose_name_plural': 'Broadcasts',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriber', '0006_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guideresendjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times the worker has claimed this job'),
+        ),
+        migrations.AddField(
+            model_name='guideresendjob',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='guideresendjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriber', '0007_guide_resend_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guideresendjob',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, help_text='A worker is sending a chunk until then', null=True),
+        ),
+        migrations.AlterField(
+            model_name='guideresendjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Claims since the last chunk that went through'),
+        ),
+    ]
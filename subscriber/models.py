@@ -21,4 +21,96 @@ class Subscriber(models.Model):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
     def full_name(self):
-        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
+
+class GuideResendJob(models.Model):
+    """
+    A bulk resend of the mini-guide started from the admin. The email worker
+    sends one chunk per round, between outbox batches, and records progress
+    here.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUSES = (
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    subscriber_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_QUEUED)
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    failures = models.JSONField(default=list, blank=True, help_text="Recipients that could not be sent to, with the error")
+    last_subscriber_id = models.BigIntegerField(default=0, help_text="Checkpoint: highest subscriber id already processed")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Claims since the last chunk that went through")
+    leased_until = models.DateTimeField(null=True, blank=True, help_text="A worker is sending a chunk until then")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Guide Resend'
+        verbose_name_plural = 'Guide Resends'
+
+    def __str__(self):
+        return f"Guide resend #{self.pk} ({self.sent + self.failed}/{self.total})"
+
+    def progress(self):
+        if not self.total:
+            return 100
+        return int((self.sent + self.failed) * 100 / self.total)
+
+
+class Broadcast(models.Model):
+    """
+    A newsletter sent once to every active subscriber by the
+    ``send_broadcast`` command. ``subject``, ``html_body`` and ``text_body``
+    are Django templates; ``{{ first_name }}``, ``{{ last_name }}``,
+    ``{{ full_name }}`` and ``{{ email }}`` are filled in per recipient.
+    """
+    STATUS_DRAFT = 'draft'
+    STATUS_SENDING = 'sending'
+    STATUS_DONE = 'done'
+    STATUSES = (
+        (STATUS_DRAFT, 'Draft'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_DONE, 'Done'),
+    )
+
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+    text_body = models.TextField(blank=True, help_text="Plain-text version. Generated from the HTML when empty")
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_DRAFT)
+    sends_per_second = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Rate limit for this broadcast. Uses BROADCAST_SENDS_PER_SECOND when empty"
+    )
+    last_subscriber_id = models.BigIntegerField(default=0, help_text="Checkpoint: highest subscriber id already sent")
+    sent_count = models.PositiveIntegerField(default=0)
+    batch_count = models.PositiveIntegerField(default=0)
+    send_seconds = models.FloatField(default=0, help_text="Time spent sending, excluding pauses between runs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Broadcast'
+        verbose_name_plural = 'Broadcasts'
+
+    def __str__(self):
+        return self.subject
+
+    def throughput(self):
+        """Recipients per second over the time spent sending."""
+        if not self.send_seconds:
+            return 0
+        return round(self.sent_count / self.send_seconds, 1)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import SubscriberViewSet
+from .views import SubscriberViewSet, download_guide
 
 urlpatterns = [
     path('', SubscriberViewSet.as_view({'post': 'create'}), name='subscriber-create'),
+    path('guide/<str:token>/', download_guide, name='subscriber-guide-download'),
 ]
\ No newline at end of file